@@ -0,0 +1,124 @@
+"""
+Weekly batch report for a whole team.
+
+Scans a directory of profile logs (one activity_log.json per person) and
+computes scores, streak, inactivity warnings and weekly score deltas for
+every profile in a process pool, then writes one consolidated report.
+
+Profiles are found as either '<dir>/<name>.json' or '<dir>/<name>/activity_log.json'.
+A config.json or weekly_report.json in the directory, and the report being
+written, are not profiles.
+
+Usage:
+    python batch_report.py <profiles_dir> [-o weekly_report.json] [-c config.json] [-w WORKERS]
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from performance_app_v2 import ACTIVITY_LOG_FILE, CONFIG_FILE, DataManager, PerformanceAI
+
+REPORT_FILE = 'weekly_report.json'
+# Top-level JSON files in a profiles directory that are never activity logs
+NON_PROFILE_FILES = {CONFIG_FILE, REPORT_FILE}
+# Aim for a few chunks per worker so slow profiles do not leave cores idle
+CHUNKS_PER_WORKER = 4
+
+# Per-process state, set once by _init_worker instead of being pickled with every task
+_worker_ai: Optional[PerformanceAI] = None
+_worker_now: Optional[datetime] = None
+
+
+def find_profile_logs(profiles_dir: str, exclude: Iterable[str] = ()) -> List[Tuple[str, str]]:
+    """
+    Returns (profile name, log path) pairs sorted by profile name, skipping
+    NON_PROFILE_FILES and the paths in 'exclude' (e.g. the report's own output).
+    """
+    excluded = {os.path.realpath(path) for path in exclude}
+    profiles = []
+    for name in sorted(os.listdir(profiles_dir)):
+        path = os.path.join(profiles_dir, name)
+        if name in NON_PROFILE_FILES or os.path.realpath(path) in excluded:
+            continue
+        if os.path.isfile(path) and name.endswith('.json'):
+            profiles.append((os.path.splitext(name)[0], path))
+        elif os.path.isfile(os.path.join(path, ACTIVITY_LOG_FILE)):
+            profiles.append((name, os.path.join(path, ACTIVITY_LOG_FILE)))
+    return profiles
+
+
+def _init_worker(config: Dict[str, Any], now: datetime):
+    global _worker_ai, _worker_now
+    _worker_ai = PerformanceAI(config)
+    _worker_now = now
+
+
+def build_profile_report(profile: Tuple[str, str]) -> Tuple[str, Dict[str, Any]]:
+    """Computes the weekly summary of one profile. Runs inside a worker process."""
+    name, log_path = profile
+    ai, now = _worker_ai, _worker_now
+    try:
+        log = DataManager(log_path).load_log()
+    except (OSError, ValueError) as e:
+        return name, {"log_file": log_path, "error": str(e)}
+
+    week_ago = (now - timedelta(days=7)).isoformat()
+    scores = ai.calculate_scores_from_log(log, now=now)
+    last_week_scores = ai.calculate_scores_from_log([e for e in log if e['timestamp'] <= week_ago], now=now - timedelta(days=7))
+    overall = ai.calculate_overall_score(scores)
+
+    return name, {
+        "log_file": log_path,
+        "entries": len(log),
+        "entries_this_week": sum(1 for e in log if e['timestamp'] > week_ago),
+        "overall_score": round(overall, 2),
+        "overall_delta": round(overall - ai.calculate_overall_score(last_week_scores), 2),
+        "scores": {cat: round(score, 2) for cat, score in scores.items()},
+        "weekly_delta": {cat: round(scores[cat] - last_week_scores[cat], 2) for cat in scores},
+        "streak": ai.calculate_streak(log, now=now),
+        "inactive_days": ai.get_inactive_categories(log, now=now),
+    }
+
+
+def generate_batch_report(profiles_dir: str, config: Dict[str, Any], workers: Optional[int] = None,
+                          now: Optional[datetime] = None, exclude: Iterable[str] = ()) -> Dict[str, Any]:
+    """Fans the profiles out over a process pool and gathers one consolidated report."""
+    now = now or datetime.now()
+    profiles = find_profile_logs(profiles_dir, exclude)
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(profiles) // (workers * CHUNKS_PER_WORKER))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(config, now)) as pool:
+        results = dict(pool.map(build_profile_report, profiles, chunksize=chunksize))
+
+    return {
+        "generated_at": now.isoformat(),
+        "week_start": (now - timedelta(days=7)).isoformat(),
+        "profile_count": len(results),
+        "profiles": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tạo báo cáo tuần cho nhiều hồ sơ người dùng.")
+    parser.add_argument('profiles_dir', help="Thư mục chứa các file log của từng người")
+    parser.add_argument('-o', '--output', default=REPORT_FILE, help="File báo cáo tổng hợp (JSON)")
+    parser.add_argument('-c', '--config', default=CONFIG_FILE, help="File cấu hình dùng chung")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="Số tiến trình (mặc định: số lõi CPU)")
+    args = parser.parse_args()
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    # The report (and a config) may live in the profiles directory; neither is a profile
+    report = generate_batch_report(args.profiles_dir, config, workers=args.workers, exclude=(args.output, args.config))
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Đã tạo báo cáo cho {report['profile_count']} hồ sơ: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
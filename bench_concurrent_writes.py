@@ -0,0 +1,74 @@
+"""
+Stress test for concurrent writers.
+
+Starts several processes that append to the same log through DataManager
+at the same moment, then checks that every entry arrived exactly once,
+with unique and increasing timestamps, and reports the aggregate append
+throughput.
+
+Usage:
+    python bench_concurrent_writes.py [-p PROCESSES] [-n ENTRIES_PER_PROCESS] [--binary]
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from typing import Dict, Any
+
+from performance_app_v2 import BINARY_LOG_EXTENSION, DataManager
+
+
+def _writer(log_path: str, worker: int, count: int, barrier):
+    data_manager = DataManager(log_path)
+    barrier.wait()
+    for seq in range(count):
+        # The quantity identifies the entry, so lost or duplicated appends can be detected
+        data_manager.log_activity('Lập trình', 'code_project', float(worker * count + seq), 1.0)
+
+
+def run_stress_test(processes: int, per_process: int, binary: bool = False) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log_path = os.path.join(tmp_dir, 'activity_log' + (BINARY_LOG_EXTENSION if binary else '.json'))
+        barrier = multiprocessing.Barrier(processes + 1)
+        workers = [multiprocessing.Process(target=_writer, args=(log_path, i, per_process, barrier))
+                   for i in range(processes)]
+        for worker in workers:
+            worker.start()
+        barrier.wait()  # every writer is imported and ready
+        started = time.perf_counter()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+
+        log = DataManager(log_path).load_log()
+        timestamps = [entry['timestamp'] for entry in log]
+        expected = processes * per_process
+        return {
+            "format": "binary" if binary else "json",
+            "expected": expected,
+            "written": len(log),
+            "no_loss": sorted(int(entry['quantity']) for entry in log) == list(range(expected)),
+            "unique_increasing_ids": all(a < b for a, b in zip(timestamps, timestamps[1:])),
+            "seconds": elapsed,
+            "appends_per_second": expected / elapsed if elapsed else float('inf'),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress test: nhiều tiến trình cùng ghi vào một file log.")
+    parser.add_argument('-p', '--processes', type=int, default=8, help="Số tiến trình ghi")
+    parser.add_argument('-n', '--entries', type=int, default=200, help="Số mục mỗi tiến trình ghi")
+    parser.add_argument('--binary', action='store_true', help=f"Dùng định dạng nhị phân ({BINARY_LOG_EXTENSION})")
+    args = parser.parse_args()
+
+    result = run_stress_test(args.processes, args.entries, args.binary)
+    print(f"[{result['format']}] {result['written']}/{result['expected']} mục, "
+          f"không mất dữ liệu: {result['no_loss']}, id tăng dần: {result['unique_increasing_ids']}, "
+          f"{result['appends_per_second']:.0f} lần ghi/giây ({result['seconds']:.2f} s)")
+    if not (result['no_loss'] and result['unique_increasing_ids']):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
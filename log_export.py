@@ -0,0 +1,160 @@
+"""
+Period aggregation and columnar export of the activity log.
+
+Groups the log by period (week or month), category and activity with
+vectorized pandas group-bys and reports total quantity, points, number of
+entries and active days. The log is processed in chunks of
+EXPORT_CHUNK_SIZE entries; each chunk is reduced to per-day partial sums
+straight away, so memory stays bounded by one chunk plus the small
+aggregate. Results, and optionally the raw log, are written as CSV or as
+Parquet with typed columns (Parquet needs pyarrow).
+
+Usage:
+    python log_export.py [-l activity_log.json] [-p week|month] [-b activity|category]
+                         [-f csv|parquet] [-o OUTPUT] [--raw RAW_OUTPUT]
+"""
+import argparse
+import os
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from performance_app_v2 import ACTIVITY_LOG_FILE, DataManager, LogColumns
+
+EXPORT_CHUNK_SIZE = 1_000_000
+PERIODS = ('week', 'month')
+EXPORT_FORMATS = ('csv', 'parquet')
+
+
+def _period_start(days: np.ndarray, period: str) -> np.ndarray:
+    """First day of the week (Monday) or month containing each datetime64[D] day."""
+    if period == 'week':
+        # 1970-01-01 was a Thursday, so (days + 3) % 7 is 0 on Mondays
+        return days - ((days.astype(np.int64) + 3) % 7).astype('timedelta64[D]')
+    return days.astype('datetime64[M]').astype('datetime64[D]')
+
+
+def _chunk_frame(columns: LogColumns) -> pd.DataFrame:
+    """Typed DataFrame of one chunk; category/activity stay compact as pandas categoricals."""
+    return pd.DataFrame({
+        "timestamp": columns.time.astype('datetime64[us]'),
+        "category": pd.Categorical.from_codes(columns.category.astype(np.int32), categories=columns.category_keys),
+        "activity": pd.Categorical.from_codes(columns.activity.astype(np.int32), categories=columns.activity_keys),
+        "quantity": np.asarray(columns.quantity, dtype=np.float64),
+        "points": np.asarray(columns.points, dtype=np.float64),
+    })
+
+
+def _daily_totals(chunks: Iterator[LogColumns], period: str) -> pd.DataFrame:
+    """Per (period, category, activity, day) sums over all chunks."""
+    partial: Optional[pd.DataFrame] = None
+    keys = ['period', 'category', 'activity', 'day']
+    for columns in chunks:
+        days = columns.time.astype('datetime64[us]').astype('datetime64[D]')
+        # Group on integer codes; only the reduced rows are turned into key strings
+        frame = pd.DataFrame({
+            "period": _period_start(days, period),
+            "category": columns.category,
+            "activity": columns.activity,
+            "day": days,
+            "quantity": np.asarray(columns.quantity, dtype=np.float64),
+            "points": np.asarray(columns.points, dtype=np.float64),
+        })
+        daily = frame.groupby(keys, sort=False).agg(
+            quantity=('quantity', 'sum'), points=('points', 'sum'), entries=('points', 'size')
+        ).reset_index()
+        # Ids are local to each chunk, so translate them before merging chunks
+        daily['category'] = np.asarray(columns.category_keys, dtype=object)[daily['category'].to_numpy()]
+        daily['activity'] = np.asarray(columns.activity_keys, dtype=object)[daily['activity'].to_numpy()]
+        daily = daily.set_index(keys)
+        partial = daily if partial is None else pd.concat([partial, daily]).groupby(level=keys, sort=False).sum()
+    if partial is None:
+        return pd.DataFrame(columns=keys + ['quantity', 'points', 'entries']).set_index(keys)
+    return partial
+
+
+def aggregate_log(data_manager: DataManager, period: str = 'week', by: str = 'activity',
+                  chunk_size: int = EXPORT_CHUNK_SIZE) -> pd.DataFrame:
+    """
+    Totals per period and category (by='category') or per period, category
+    and activity (by='activity'): quantity, points, entries and active days.
+    """
+    if period not in PERIODS:
+        raise ValueError(f"period must be one of {PERIODS}")
+    group = ['period', 'category'] if by == 'category' else ['period', 'category', 'activity']
+    daily = _daily_totals(data_manager.iter_column_chunks(chunk_size), period)
+
+    # Collapse to one row per group and day first, so each active day is counted once
+    per_day = daily.groupby(level=group + ['day']).sum()
+    result = per_day.groupby(level=group).agg(
+        quantity=('quantity', 'sum'), points=('points', 'sum'),
+        entries=('entries', 'sum'), active_days=('entries', 'size')
+    ).reset_index()
+    result['entries'] = result['entries'].astype(np.int64)
+    result['active_days'] = result['active_days'].astype(np.int64)
+    return result.sort_values(group, ignore_index=True)
+
+
+def _write_frames(frames: Iterator[pd.DataFrame], path: str, file_format: str):
+    """Writes DataFrames one after another into a single CSV or Parquet file."""
+    if file_format == 'csv':
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            for i, frame in enumerate(frames):
+                frame.to_csv(f, header=(i == 0), index=False)
+        return
+
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Xuất Parquet cần thư viện 'pyarrow' (pip install pyarrow).")
+    writer = None
+    try:
+        for frame in frames:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            # Categoricals become dictionary columns; per-chunk dictionaries are fine for Parquet
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def export_summary(data_manager: DataManager, path: str, period: str = 'week', by: str = 'activity',
+                   file_format: str = 'csv'):
+    _write_frames(iter([aggregate_log(data_manager, period, by)]), path, file_format)
+
+
+def export_raw_log(data_manager: DataManager, path: str, file_format: str = 'csv',
+                   chunk_size: int = EXPORT_CHUNK_SIZE):
+    """Streams the effective log into CSV/Parquet, one chunk at a time."""
+    def frames() -> Iterator[pd.DataFrame]:
+        for columns in data_manager.iter_column_chunks(chunk_size):
+            yield _chunk_frame(columns)
+    _write_frames(frames(), path, file_format)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tổng hợp theo tuần/tháng và xuất lịch sử hoạt động.")
+    parser.add_argument('-l', '--log', default=ACTIVITY_LOG_FILE, help="File log (JSON hoặc nhị phân)")
+    parser.add_argument('-p', '--period', choices=PERIODS, default='week', help="Chu kỳ tổng hợp")
+    parser.add_argument('-b', '--by', choices=('activity', 'category'), default='activity', help="Mức chi tiết")
+    parser.add_argument('-f', '--format', choices=EXPORT_FORMATS, default='csv', help="Định dạng file xuất")
+    parser.add_argument('-o', '--output', default=None, help="File kết quả tổng hợp")
+    parser.add_argument('--raw', default=None, help="Xuất thêm toàn bộ log gốc vào file này")
+    args = parser.parse_args()
+
+    data_manager = DataManager(args.log)
+    output = args.output or f"summary_{args.period}_{args.by}.{args.format}"
+    export_summary(data_manager, output, args.period, args.by, args.format)
+    print(f"Đã xuất bảng tổng hợp: {output}")
+    if args.raw:
+        raw_format = os.path.splitext(args.raw)[1].lstrip('.').lower()
+        export_raw_log(data_manager, args.raw, raw_format if raw_format in EXPORT_FORMATS else args.format)
+        print(f"Đã xuất log gốc: {args.raw}")
+
+
+if __name__ == "__main__":
+    main()
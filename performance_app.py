@@ -30,7 +30,8 @@ class PerformanceAI:
         if not self.config:
             messagebox.showerror("Lỗi", f"Không thể tải file cấu hình '{config_path}'. Chương trình sẽ thoát.")
             exit()
-        self.categories = list(self.config.keys())
+        # Keys starting with '_' hold settings shared with v2, not categories
+        self.categories = [key for key in self.config if not key.startswith('_')]
 
     def _load_json(self, file_path: str) -> Optional[Dict[str, Any]]:
         try:
@@ -51,8 +52,8 @@ class PerformanceAI:
     def get_overall_performance(self, scores: Dict[str, float]) -> float:
         """Calculates the weighted overall performance score."""
         total_weighted_score = 0.0
-        for cat_key, cat_config in self.config.items():
-            weight = cat_config.get('weight', 0)
+        for cat_key in self.categories:
+            weight = self.config[cat_key].get('weight', 0)
             score = scores.get(cat_key, 0)
             total_weighted_score += score * weight
         return total_weighted_score
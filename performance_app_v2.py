@@ -1,21 +1,95 @@
+import asyncio
+import bisect
+import heapq
+import itertools
 import json
 import os
+import struct
+import threading
 import tkinter as tk
-from tkinter import ttk, messagebox
-from typing import Dict, Any, List, Optional, Tuple
-from datetime import datetime, timedelta
-from collections import defaultdict
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from types import MappingProxyType
+from tkinter import ttk, messagebox, filedialog
+from typing import Callable, Collection, Dict, Any, FrozenSet, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+from datetime import date, datetime, timedelta
+from collections import Counter, defaultdict
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+import numpy as np
+import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 
 # --- CONSTANTS ---
 CONFIG_FILE = 'config.json'
 # <<< NÂNG CẤP 1: Chuyển sang file log để lưu lịch sử >>>
 ACTIVITY_LOG_FILE = 'activity_log.json' 
 INITIAL_SCORE = 30.0
+SECONDS_PER_DAY = 86400.0
+# Days without any entry before a category is reported as inactive
+INACTIVITY_DAYS = 7
 APP_TITLE = "Trợ Lý Hiệu Suất Cá Nhân v2.0"
 WINDOW_GEOMETRY = "1200x700"
+# Block size used when streaming the log file forwards or backwards
+LOG_READ_CHUNK_SIZE = 1 << 20
+# Minimum number of points kept per trend line when downsampling
+MIN_TREND_POINTS = 50
+
+# --- BINARY LOG FORMAT ---
+# Logs whose file name ends with this extension are stored as fixed-width records
+BINARY_LOG_EXTENSION = '.plog'
+BINARY_LOG_MAGIC = b'PLOG'
+BINARY_LOG_VERSION = 1
+# Bytes reserved for the header of a new file; the id table can grow inside it without moving records
+BINARY_HEADER_SIZE = 4096
+# magic, version, reserved, offset of the first record, length of the JSON id table
+BINARY_PREAMBLE = struct.Struct('<4sHHII')
+BINARY_RECORD_DTYPE = np.dtype([
+    ('time', '<i8'),        # microseconds since EPOCH (naive local time, as logged)
+    ('category', '<u2'),    # index into the header's 'categories' list
+    ('activity', '<u2'),    # index into the header's 'activities' list
+    ('kind', 'u1'),         # RECORD_KIND_*: activity entry or delete/edit tombstone
+    ('reserved', 'V3'),
+    ('quantity', '<f8'),
+    ('points', '<f8'),
+])
+EPOCH = datetime(1970, 1, 1)
+# Record kinds of the binary format; tombstones store the target entry's timestamp in 'time'
+RECORD_KIND_ENTRY, RECORD_KIND_DELETE, RECORD_KIND_EDIT = 0, 1, 2
+TOMBSTONE_KINDS = {'delete': RECORD_KIND_DELETE, 'edit': RECORD_KIND_EDIT}
+# Number of entries between two score checkpoints of a ScoreLedger
+CHECKPOINT_INTERVAL = 1000
+# Pixel height of one journal row; the visible page size is derived from it
+JOURNAL_ROW_HEIGHT = 22
+JOURNAL_HEADER_HEIGHT = 26
+JOURNAL_DATE_FORMAT = '%d/%m/%Y'
+ALL_FILTER_LABEL = "Tất cả"
+HEATMAP_CMAP = 'Greens'
+WEEKDAY_LABELS = ("T2", "T3", "T4", "T5", "T6", "T7", "CN")
+HEATMAP_MEASURES = (('count', "Số lần"), ('points', "Điểm"))
+# Points per curve in the what-if comparison chart
+WHAT_IF_TREND_POINTS = 1000
+# Longest single sleep of the reminder scheduler, so wall-clock jumps (suspend, clock changes) are noticed
+MAX_SCHEDULER_SLEEP = 3600.0
+# Reserved config.json key: keep only this many trailing days of entries in memory (rolling window mode)
+ROLLING_WINDOW_KEY = '_rolling_window_days'
+# Entries read from disk per batch while loading in rolling window mode
+FOLD_BATCH_SIZE = 10000
+# Reserved config.json key holding the feedback rules; keys starting with '_' are never categories
+FEEDBACK_RULES_KEY = '_feedback_rules'
+FEEDBACK_FALLBACK = "Mọi thứ đang tiến triển tốt. Hãy tiếp tục duy trì!"
+# Used when config.json has no FEEDBACK_RULES_KEY; reproduces the original hard-coded checks
+DEFAULT_FEEDBACK_RULES = [
+    {"type": "best_category"},
+    {"type": "worst_category", "threshold": 50},
+    {"type": "inactivity", "days": INACTIVITY_DAYS},
+]
 
 # Set font for Matplotlib to support Vietnamese
 plt.style.use('seaborn-v0_8-whitegrid')
@@ -24,13 +98,126 @@ plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'DejaVu Sans', 'Tahoma']
 plt.rcParams['axes.unicode_minus'] = False
 
 
+def downsample_lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduces a series sorted by x to 'threshold' points with the
+    Largest-Triangle-Three-Buckets algorithm, which keeps the visual shape
+    (peaks, drops) of the curve. The first and last points are always kept.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    # threshold - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+
+    anchor = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average point of the next bucket (the last point for the final bucket)
+        next_start, next_end = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        areas = np.abs((x[anchor] - avg_x) * (y[start:end] - y[anchor])
+                       - (x[anchor] - x[start:end]) * (avg_y - y[anchor]))
+        anchor = start + int(areas.argmax())
+        selected[i + 1] = anchor
+
+    return x[selected], y[selected]
+
+
+def datetime_to_micros(moment: datetime) -> int:
+    return (moment - EPOCH) // timedelta(microseconds=1)
+
+
+def micros_to_datetime(micros: int) -> datetime:
+    return EPOCH + timedelta(microseconds=micros)
+
+
+class LogColumns(NamedTuple):
+    """
+    Column view of the activity log: one array per field, all sharing the same index.
+    Category and activity are small integer ids into 'category_keys' / 'activity_keys'.
+    """
+    time: np.ndarray        # int64 microseconds since EPOCH
+    category: np.ndarray
+    activity: np.ndarray
+    quantity: np.ndarray
+    points: np.ndarray
+    category_keys: List[str]
+    activity_keys: List[str]
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Dict[str, Any]]) -> 'LogColumns':
+        category_ids: Dict[str, int] = {}
+        activity_ids: Dict[str, int] = {}
+        times, categories, activities, quantities, points = [], [], [], [], []
+        for entry in entries:
+            times.append(datetime_to_micros(datetime.fromisoformat(entry['timestamp'])))
+            categories.append(category_ids.setdefault(entry['category'], len(category_ids)))
+            activities.append(activity_ids.setdefault(entry['activity'], len(activity_ids)))
+            quantities.append(entry.get('quantity', 0))
+            points.append(entry.get('points', 0))
+        return cls(
+            np.array(times, dtype=np.int64), np.array(categories, dtype=np.uint16),
+            np.array(activities, dtype=np.uint16), np.array(quantities, dtype=float),
+            np.array(points, dtype=float), list(category_ids), list(activity_ids)
+        )
+
+
+class WhatIfResult(NamedTuple):
+    """Scores of the whole history under one config; see PerformanceAI.what_if."""
+    scores: Dict[str, float]
+    overall: float
+    history: Dict[str, Tuple[np.ndarray, np.ndarray]]    # as get_historical_scores_from_columns
+
+
+class AnalyticsSnapshot(NamedTuple):
+    """
+    Read-only view of the log as of 'now', taken by ScoreLedger.snapshot
+    from the state it keeps up to date: everything the UI shows on a refresh.
+    """
+    now: datetime
+    scores: Mapping[str, float]
+    history: Mapping[str, Tuple[Tuple[datetime, float], ...]]    # trend points per category
+    last_activity: Mapping[str, Optional[datetime]]
+    active_days: FrozenSet[date]
+    streak: int
+
+
 class PerformanceAI:
     """
     Handles advanced business logic, including historical analysis and feedback.
     """
     def __init__(self, config: Dict[str, Any]):
         self.config = config
-        self.categories = list(config.keys())
+        self.categories = [key for key in config if not key.startswith('_')]
+        # Half-life of each category's score in seconds (None = no decay)
+        self.half_lives = {cat: self._read_half_life(config[cat]) for cat in self.categories}
+        self.feedback = FeedbackEngine(self, config.get(FEEDBACK_RULES_KEY, DEFAULT_FEEDBACK_RULES))
+        # Reminders and reports warn at the same threshold as the inactivity feedback rule
+        self.inactivity_days = self.feedback.inactivity_days()
+
+    @staticmethod
+    def _read_half_life(category_config: Dict[str, Any]) -> Optional[float]:
+        half_life_days = category_config.get('half_life_days')
+        if not half_life_days or half_life_days <= 0:
+            return None
+        return float(half_life_days) * SECONDS_PER_DAY
+
+    def decay_score(self, category_key: str, score: float, elapsed_seconds: float) -> float:
+        """
+        Applies the closed-form decay of a category score over an elapsed time.
+        The part of the score above INITIAL_SCORE halves every 'half_life_days',
+        so no stored entry ever has to be rewritten.
+        """
+        half_life = self.half_lives.get(category_key)
+        if not half_life or elapsed_seconds <= 0 or score <= INITIAL_SCORE:
+            return score
+        return INITIAL_SCORE + (score - INITIAL_SCORE) * 0.5 ** (elapsed_seconds / half_life)
 
     def calculate_improvement(self, category_key: str, activity_key: str, quantity: float) -> float:
         try:
@@ -39,114 +226,1585 @@ class PerformanceAI:
         except KeyError:
             return 0.0
 
-    def calculate_scores_from_log(self, log: List[Dict[str, Any]]) -> Dict[str, float]:
-        """Calculates current scores by processing the entire activity log."""
+    def calculate_scores_from_log(self, log: List[Dict[str, Any]], now: Optional[datetime] = None) -> Dict[str, float]:
+        """
+        Calculates current scores by processing the entire activity log.
+        Decay is evaluated lazily: between two entries of a category and from
+        its last entry up to 'now'. Timestamps are only parsed for decaying categories.
+        """
         scores = {cat: INITIAL_SCORE for cat in self.categories}
+        last_times: Dict[str, datetime] = {}
         for entry in log:
-            cat = entry.get('category')
-            points = entry.get('points', 0)
-            if cat in scores:
-                scores[cat] = min(100.0, scores[cat] + points)
-        return scores
+            self.apply_entry(scores, last_times, entry)
+        return self.decay_scores_to(scores, last_times, now or datetime.now())
+
+    def apply_entry(self, scores: Dict[str, float], last_times: Dict[str, datetime], entry: Dict[str, Any],
+                    history: Optional[Dict[str, List[Tuple[datetime, float]]]] = None):
+        """
+        Advances running scores by one entry, decaying its category up to the
+        entry's time first. With 'history', also appends the entry's trend points.
+        """
+        cat = entry.get('category')
+        if cat not in scores:
+            return
+        if self.half_lives[cat] or history is not None:
+            timestamp = datetime.fromisoformat(entry['timestamp'])
+        if self.half_lives[cat]:
+            if cat in last_times:
+                decayed = self.decay_score(cat, scores[cat], (timestamp - last_times[cat]).total_seconds())
+                if history is not None and decayed != scores[cat]:
+                    # Show how far the score had fallen right before this entry
+                    history[cat].append((timestamp, decayed))
+                scores[cat] = decayed
+            last_times[cat] = timestamp
+        scores[cat] = min(100.0, scores[cat] + entry.get('points', 0))
+        if history is not None:
+            history[cat].append((timestamp, scores[cat]))
 
-    def get_historical_scores(self, log: List[Dict[str, Any]]) -> Dict[str, List[Tuple[datetime, float]]]:
+    def decay_scores_to(self, scores: Dict[str, float], last_times: Dict[str, datetime], now: datetime) -> Dict[str, float]:
+        """Returns a copy of running scores with each category decayed from its last entry up to 'now'."""
+        decayed = dict(scores)
+        for cat, last_time in last_times.items():
+            decayed[cat] = self.decay_score(cat, decayed[cat], (now - last_time).total_seconds())
+        return decayed
+
+    def get_historical_scores(self, log: List[Dict[str, Any]], now: Optional[datetime] = None) -> Dict[str, List[Tuple[datetime, float]]]:
         """Processes the log to generate time-series data for the trend chart."""
-        history = {cat: [(datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=30), INITIAL_SCORE)] for cat in self.categories}
-        
-        # Sort log by date to ensure correct chronological processing
-        sorted_log = sorted(log, key=lambda x: x['timestamp'])
-        
-        temp_scores = {cat: INITIAL_SCORE for cat in self.categories}
+        return {cat: list(points) for cat, points in self.build_snapshot(log, now).history.items()}
 
-        for entry in sorted_log:
-            cat = entry.get('category')
-            points = entry.get('points', 0)
-            timestamp = datetime.fromisoformat(entry['timestamp'])
-            
-            if cat in temp_scores:
-                temp_scores[cat] = min(100.0, temp_scores[cat] + points)
-                history[cat].append((timestamp, temp_scores[cat]))
-        
-        return history
+    def build_snapshot(self, log: List[Dict[str, Any]], now: Optional[datetime] = None,
+                       cold: Optional['ColdHistory'] = None) -> AnalyticsSnapshot:
+        """
+        One-off AnalyticsSnapshot of a log (plus the older entries summarized
+        in 'cold', in rolling window mode). The app keeps a ScoreLedger
+        instead and takes its snapshots incrementally.
+        """
+        return ScoreLedger(self, log, cold).snapshot(now)
 
-    # <<< NÂNG CẤP 2: Phương thức AI đưa ra nhận xét >>>
-    def get_ai_feedback(self, scores: Dict[str, float], log: List[Dict[str, Any]]) -> str:
-        """Generates intelligent feedback based on current scores and activity history."""
-        feedback = []
-        
-        # 1. Find best and worst performing categories
-        if scores:
-            best_cat = max(scores, key=scores.get)
-            worst_cat = min(scores, key=scores.get)
-            feedback.append(f"🚀 Phong độ cao nhất: '{self.config[best_cat]['name']}' ({scores[best_cat]:.1f}/100).")
-            if scores[worst_cat] < 50:
-                feedback.append(f"🤔 Cần chú ý: '{self.config[worst_cat]['name']}' ({scores[worst_cat]:.1f}/100). Hãy thử một hoạt động nhỏ nhé!")
-
-        # 2. Check for inactivity
-        last_activity_dates = {cat: None for cat in self.categories}
-        for entry in reversed(log):
+    def _split_columns(self, columns: LogColumns) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """Splits the columns into chronological (times, points) arrays per known category."""
+        time, category, points = columns.time, columns.category, columns.points
+        if len(time) > 1 and (np.diff(time) < 0).any():
+            order = np.argsort(time, kind='stable')
+            time, category, points = time[order], category[order], points[order]
+
+        per_category = {}
+        for cat_id, cat in enumerate(columns.category_keys):
+            if cat in self.half_lives:
+                mask = category == cat_id
+                if mask.any():
+                    per_category[cat] = (time[mask], points[mask])
+        return per_category
+
+    def _replay_category(self, category_key: str, times: np.ndarray, points: np.ndarray) -> np.ndarray:
+        """Score of one category right after each of its entries."""
+        if not self.half_lives[category_key] and (points >= 0).all():
+            # With no decay and no negative points the 100 cap is reached once and then stays
+            return np.minimum(100.0, INITIAL_SCORE + np.cumsum(points))
+
+        scores = np.empty(len(points))
+        score, last_time = INITIAL_SCORE, None
+        for i, (t, p) in enumerate(zip(times.tolist(), points.tolist())):
+            if last_time is not None:
+                score = self.decay_score(category_key, score, (t - last_time) / 1e6)
+            score = min(100.0, score + p)
+            scores[i], last_time = score, t
+        return scores
+
+    def calculate_scores_from_columns(self, columns: LogColumns, now: Optional[datetime] = None) -> Dict[str, float]:
+        """Same result as calculate_scores_from_log, computed over LogColumns arrays."""
+        return self._scores_from_history(self.get_historical_scores_from_columns(columns), now)
+
+    def get_historical_scores_from_columns(self, columns: LogColumns) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """Per category: (entry times in microseconds since EPOCH, score after each entry)."""
+        return {cat: (times, self._replay_category(cat, times, points))
+                for cat, (times, points) in self._split_columns(columns).items()}
+
+    def _scores_from_history(self, history: Dict[str, Tuple[np.ndarray, np.ndarray]],
+                             now: Optional[datetime] = None) -> Dict[str, float]:
+        """Current scores from the last point of each curve, decayed up to 'now'."""
+        now_micros = datetime_to_micros(now or datetime.now())
+        scores = {cat: INITIAL_SCORE for cat in self.categories}
+        for cat, (times, values) in history.items():
+            scores[cat] = self.decay_score(cat, float(values[-1]), (now_micros - int(times[-1])) / 1e6)
+        return scores
+
+    def impact_table(self, columns: LogColumns) -> np.ndarray:
+        """
+        impact_per_unit of this config for every (category id, activity id)
+        pair of the columns; 0 where the config has no such activity, like
+        calculate_improvement.
+        """
+        table = np.zeros((len(columns.category_keys), len(columns.activity_keys)))
+        activity_ids = {key: i for i, key in enumerate(columns.activity_keys)}
+        for cat_id, cat in enumerate(columns.category_keys):
+            if cat in self.half_lives:
+                for act, activity in self.config[cat].get('activities', {}).items():
+                    if act in activity_ids:
+                        table[cat_id, activity_ids[act]] = activity.get('impact_per_unit', 0)
+        return table
+
+    def reprice(self, columns: LogColumns) -> LogColumns:
+        """The columns with 'points' recomputed from 'quantity' under this config, in one vectorized lookup."""
+        table = self.impact_table(columns)
+        return columns._replace(points=columns.quantity * table[columns.category, columns.activity])
+
+    def what_if(self, columns: LogColumns, now: Optional[datetime] = None, reprice: bool = True) -> WhatIfResult:
+        """
+        Scores, overall score and history of the whole log under this
+        config. With reprice=True the logged quantities are re-scored with
+        this config's impacts instead of the points stored at logging time;
+        load a candidate config into its own PerformanceAI to compare it.
+        """
+        if reprice:
+            columns = self.reprice(columns)
+        history = self.get_historical_scores_from_columns(columns)
+        scores = self._scores_from_history(history, now)
+        return WhatIfResult(scores, self.calculate_overall_score(scores), history)
+
+    def calculate_overall_score(self, scores: Dict[str, float]) -> float:
+        """Weighted sum of the category scores, using each category's 'weight'."""
+        return sum(s * self.config[c].get('weight', 0) for c, s in scores.items())
+
+    def get_last_activity_dates(self, entries_newest_first: Iterable[Dict[str, Any]],
+                                categories: Optional[Iterable[str]] = None) -> Dict[str, Optional[datetime]]:
+        """
+        Finds the last entry time of every category (or of 'categories').
+        Stops consuming the iterable as soon as all of them are found, so it
+        can be fed straight from DataManager.iter_log_reversed().
+        """
+        last_activity_dates: Dict[str, Optional[datetime]] = dict.fromkeys(categories or self.categories)
+        missing = len(last_activity_dates)
+        for entry in entries_newest_first:
             cat = entry['category']
             if cat in last_activity_dates and last_activity_dates[cat] is None:
-                 last_activity_dates[cat] = datetime.fromisoformat(entry['timestamp'])
-        
+                last_activity_dates[cat] = datetime.fromisoformat(entry['timestamp'])
+                missing -= 1
+                if not missing:
+                    break
+        return last_activity_dates
+
+    def get_inactive_categories(self, log: List[Dict[str, Any]], now: Optional[datetime] = None) -> Dict[str, int]:
+        """Returns {category: days since last entry} for categories idle for 'inactivity_days' or more."""
+        return self.get_inactive_categories_from_recent(reversed(log), now)
+
+    def get_inactive_categories_from_recent(self, entries_newest_first: Iterable[Dict[str, Any]],
+                                            now: Optional[datetime] = None) -> Dict[str, int]:
+        """get_inactive_categories for entries newest first, e.g. DataManager.iter_log_reversed()."""
+        now = now or datetime.now()
+        last_activity_dates = self.get_last_activity_dates(entries_newest_first)
+
+        inactive = {}
         for cat, last_date in last_activity_dates.items():
             if last_date:
-                days_since = (datetime.now() - last_date).days
-                if days_since >= 7:
-                    feedback.append(f"⚠️ Cảnh báo: Đã {days_since} ngày bạn chưa có hoạt động cho '{self.config[cat]['name']}'.")
-        
+                days_since = (now - last_date).days
+                if days_since >= self.inactivity_days:
+                    inactive[cat] = days_since
+        return inactive
+
+    # <<< NÂNG CẤP 2: Phương thức AI đưa ra nhận xét >>>
+    def get_ai_feedback(self, scores: Mapping[str, float], log: List[Dict[str, Any]],
+                        category_versions: Optional[Dict[str, int]] = None, version: Optional[int] = None,
+                        now: Optional[datetime] = None, snapshot: Optional[AnalyticsSnapshot] = None) -> str:
+        """
+        Generates feedback from the configured rules. Pass the data versions
+        of a ScoreLedger to reuse the results of rules whose inputs did not
+        change, and a snapshot of the same log to reuse its last-activity map and streak.
+        """
+        feedback = self.feedback.evaluate(scores, log, category_versions, version, now, snapshot)
         if not feedback:
-            return "Mọi thứ đang tiến triển tốt. Hãy tiếp tục duy trì!"
-            
+            return FEEDBACK_FALLBACK
         return "\n\n".join(feedback)
 
     # <<< NÂNG CẤP 3: Phương thức tính chuỗi ngày hoạt động >>>
-    def calculate_streak(self, log: List[Dict[str, Any]]) -> int:
+    def calculate_streak(self, log: List[Dict[str, Any]], now: Optional[datetime] = None) -> int:
         """Calculates the current continuous activity streak."""
-        if not log:
-            return 0
-        
         # Get unique days the user was active, ignoring time
-        active_dates = sorted(list(set(datetime.fromisoformat(entry['timestamp']).date() for entry in log)), reverse=True)
-        
-        today = datetime.now().date()
-        yesterday = today - timedelta(days=1)
-        
-        # If last activity was not today or yesterday, streak is broken
-        if not active_dates or (active_dates[0] != today and active_dates[0] != yesterday):
+        active_days = {date.fromisoformat(entry['timestamp'][:10]) for entry in log}
+        return self.streak_from_days(active_days, (now or datetime.now()).date())
+
+    def calculate_streak_from_recent(self, entries_newest_first: Iterable[Dict[str, Any]], now: Optional[datetime] = None) -> int:
+        """
+        calculate_streak for entries newest first, e.g. DataManager.iter_log_reversed().
+        Stops at the first gap between active days, so only the entries of
+        the current streak are ever read.
+        """
+        today = (now or datetime.now()).date()
+        active_days = set()
+        oldest = today
+        for entry in entries_newest_first:
+            day = date.fromisoformat(entry['timestamp'][:10])
+            if day < oldest - timedelta(days=1):
+                break  # older entries cannot reach the run that ends today or yesterday
+            active_days.add(day)
+            oldest = min(oldest, day)
+        return self.streak_from_days(active_days, today)
+
+    @staticmethod
+    def streak_from_days(active_days: Collection[date], today: date) -> int:
+        """The run of consecutive active days ending today, or yesterday if there is no entry today yet."""
+        # Entries dated in the future break the streak
+        if not active_days or max(active_days) > today:
             return 0
-            
         streak = 0
-        # Start checking from today (or yesterday if no activity today)
-        current_day = active_dates[0]
-        
-        for i, day in enumerate(active_dates):
-            if current_day - timedelta(days=i) == day:
-                streak += 1
-            else:
-                break # Streak is broken
+        day = today if today in active_days else today - timedelta(days=1)
+        while day in active_days:
+            streak += 1
+            day -= timedelta(days=1)
         return streak
 
 
+_data_versions = itertools.count(1)
+
+
+def new_data_version() -> int:
+    """Process-wide unique version stamp, so versions from different ledgers never collide."""
+    return next(_data_versions)
+
+
+class FeedbackContext:
+    """
+    The derived inputs of one feedback evaluation. Each input is computed
+    only when a rule that is not memoized asks for it, and 'version()' gives
+    the key its memoized results are checked against.
+    """
+    def __init__(self, engine: 'FeedbackEngine', scores: Mapping[str, float], log: List[Dict[str, Any]],
+                 category_versions: Optional[Dict[str, int]], version: Optional[int], now: Optional[datetime],
+                 snapshot: Optional[AnalyticsSnapshot] = None):
+        self.engine = engine
+        self.ai = engine.ai
+        self.scores = scores
+        self.log = log
+        self.snapshot = snapshot
+        self.now = now or (snapshot.now if snapshot else datetime.now())
+        self.today = self.now.date()
+        if category_versions is None:
+            # Unversioned data: fresh stamps, so nothing is reused
+            category_versions = {cat: new_data_version() for cat in self.ai.categories}
+            version = new_data_version()
+        self.category_versions = category_versions
+        self.data_version = version
+        self._streak: Optional[int] = None
+        self._period_totals: Dict[int, Dict[str, float]] = {}
+
+    def _categories(self, category_key: Optional[str]) -> List[str]:
+        return [category_key] if category_key else self.ai.categories
+
+    def version(self, input_name: str, category_key: Optional[str] = None) -> Any:
+        """Version of one input, for a single category or for all of them (category_key=None)."""
+        cats = self._categories(category_key)
+        if input_name == 'scores':
+            # Decaying scores also move with time, so key on the scores as the messages show them
+            return tuple(round(self.scores[c], 1) for c in cats)
+        if input_name == 'last_activity':
+            # 'Days since' is part of the version: it grows without any new entry
+            return tuple((self.category_versions[c], self.days_since(c)) for c in cats)
+        if input_name == 'streak':
+            return self.data_version, self.today
+        if input_name == 'period_totals':
+            return tuple(self.category_versions[c] for c in cats), self.today
+        raise ValueError(f"Unknown feedback input '{input_name}'")
+
+    def last_activity(self, category_key: str) -> Optional[datetime]:
+        if self.snapshot:
+            return self.snapshot.last_activity[category_key]
+        return self.engine.last_activity(self, category_key)
+
+    def days_since(self, category_key: str) -> Optional[int]:
+        last_date = self.last_activity(category_key)
+        return (self.now - last_date).days if last_date else None
+
+    def streak(self) -> int:
+        if self._streak is None:
+            if self.snapshot:
+                return self.snapshot.streak
+            self._streak = self.ai.calculate_streak_from_recent(reversed(self.log), self.now)
+        return self._streak
+
+    def period_total(self, category_key: str, window_days: int) -> float:
+        """Points of a category over the last 'window_days' calendar days, today included."""
+        if window_days not in self._period_totals:
+            first_day = (self.today - timedelta(days=window_days - 1)).isoformat()
+            totals = defaultdict(float)
+            for entry in reversed(self.log):
+                if entry['timestamp'] < first_day:
+                    break
+                totals[entry['category']] += entry.get('points', 0)
+            self._period_totals[window_days] = totals
+        return self._period_totals[window_days].get(category_key, 0.0)
+
+
+class FeedbackRule(ABC):
+    """
+    One configurable feedback check. Subclasses list the derived inputs they
+    read in 'inputs' and are evaluated per category when 'per_category' is set.
+    The rule's config supplies thresholds and an optional 'message' template
+    formatted with the fields documented on each subclass.
+    """
+    inputs: Tuple[str, ...] = ()
+    per_category = False
+    defaults: Dict[str, Any] = {}
+    message = ''
+
+    def __init__(self, ai: PerformanceAI, params: Dict[str, Any]):
+        self.ai = ai
+        self.params = {**self.defaults, **params}
+        self.message = self.params.get('message', self.message)
+
+    def name(self, category_key: str) -> str:
+        return self.ai.config[category_key]['name']
+
+    @abstractmethod
+    def evaluate(self, context: FeedbackContext, category_key: Optional[str]) -> List[str]:
+        """Messages of this rule for one category (per_category rules) or for all of them (category_key=None)."""
+
+
+class BestCategoryRule(FeedbackRule):
+    """Highest scoring category. Fields: name, score."""
+    inputs = ('scores',)
+    message = "🚀 Phong độ cao nhất: '{name}' ({score:.1f}/100)."
+
+    def evaluate(self, context, category_key):
+        scores = context.scores
+        if not scores:
+            return []
+        best = max(scores, key=scores.get)
+        return [self.message.format(name=self.name(best), score=scores[best])]
+
+
+class WorstCategoryRule(FeedbackRule):
+    """Lowest scoring category, when below 'threshold'. Fields: name, score, threshold."""
+    inputs = ('scores',)
+    defaults = {"threshold": 50}
+    message = "🤔 Cần chú ý: '{name}' ({score:.1f}/100). Hãy thử một hoạt động nhỏ nhé!"
+
+    def evaluate(self, context, category_key):
+        scores = context.scores
+        if not scores:
+            return []
+        worst = min(scores, key=scores.get)
+        if scores[worst] >= self.params['threshold']:
+            return []
+        return [self.message.format(name=self.name(worst), score=scores[worst], threshold=self.params['threshold'])]
+
+
+class InactivityRule(FeedbackRule):
+    """A category without entries for at least 'days' days. Fields: name, days."""
+    inputs = ('last_activity',)
+    per_category = True
+    defaults = {"days": INACTIVITY_DAYS}
+    message = "⚠️ Cảnh báo: Đã {days} ngày bạn chưa có hoạt động cho '{name}'."
+
+    def evaluate(self, context, category_key):
+        days_since = context.days_since(category_key)
+        if days_since is None or days_since < self.params['days']:
+            return []
+        return [self.message.format(name=self.name(category_key), days=days_since)]
+
+
+class StreakRule(FeedbackRule):
+    """Current streak of at least 'min_days' days. Fields: streak."""
+    inputs = ('streak',)
+    defaults = {"min_days": 3}
+    message = "🔥 Bạn đã duy trì chuỗi {streak} ngày liên tiếp. Tiếp tục nhé!"
+
+    def evaluate(self, context, category_key):
+        streak = context.streak()
+        if streak < self.params['min_days']:
+            return []
+        return [self.message.format(streak=streak)]
+
+
+class PeriodTotalRule(FeedbackRule):
+    """
+    A category that earned fewer than 'min_points' points over the last
+    'window_days' days. Fields: name, points, min_points, window_days.
+    """
+    inputs = ('period_totals',)
+    per_category = True
+    defaults = {"window_days": 7, "min_points": 10}
+    message = "📉 {window_days} ngày qua '{name}' mới được {points:.1f} điểm (mục tiêu {min_points:g})."
+
+    def evaluate(self, context, category_key):
+        points = context.period_total(category_key, self.params['window_days'])
+        if points >= self.params['min_points']:
+            return []
+        return [self.message.format(name=self.name(category_key), points=points, **self.params)]
+
+
+# Rule 'type' names accepted in config.json
+FEEDBACK_RULE_TYPES = {
+    'best_category': BestCategoryRule,
+    'worst_category': WorstCategoryRule,
+    'inactivity': InactivityRule,
+    'streak': StreakRule,
+    'period_total': PeriodTotalRule,
+}
+
+
+class FeedbackEngine:
+    """
+    Evaluates the configured feedback rules in order. The messages of each
+    rule (and category, for per-category rules) are memoized against the
+    versions of the inputs it declares, so after a new entry only the rules
+    reading that category, or the global streak, run again.
+    """
+    def __init__(self, ai: PerformanceAI, rule_configs: List[Dict[str, Any]]):
+        self.ai = ai
+        self.rules: List[FeedbackRule] = []
+        for rule_config in rule_configs:
+            rule_type = FEEDBACK_RULE_TYPES.get(rule_config.get('type'))
+            if rule_type is None:
+                raise ValueError(f"Unknown feedback rule type '{rule_config.get('type')}' in '{FEEDBACK_RULES_KEY}'")
+            self.rules.append(rule_type(ai, {k: v for k, v in rule_config.items() if k != 'type'}))
+        self._results: Dict[Tuple[int, Optional[str]], Tuple[Any, List[str]]] = {}
+        # Last entry time of each category, keyed by the category's data version
+        self._last_activity: Dict[str, Tuple[int, Optional[datetime]]] = {}
+
+    def inactivity_days(self) -> int:
+        """Smallest 'days' of the configured inactivity rules; INACTIVITY_DAYS if there are none."""
+        return min((rule.params['days'] for rule in self.rules if isinstance(rule, InactivityRule)),
+                   default=INACTIVITY_DAYS)
+
+    def evaluate(self, scores: Mapping[str, float], log: List[Dict[str, Any]],
+                 category_versions: Optional[Dict[str, int]] = None, version: Optional[int] = None,
+                 now: Optional[datetime] = None, snapshot: Optional[AnalyticsSnapshot] = None) -> List[str]:
+        context = FeedbackContext(self, scores, log, category_versions, version, now, snapshot)
+        messages = []
+        for index, rule in enumerate(self.rules):
+            for cat in (self.ai.categories if rule.per_category else [None]):
+                key = tuple(context.version(name, cat) for name in rule.inputs)
+                memo = self._results.get((index, cat))
+                if memo is None or memo[0] != key:
+                    memo = (key, rule.evaluate(context, cat))
+                    self._results[(index, cat)] = memo
+                messages.extend(memo[1])
+        return messages
+
+    def last_activity(self, context: FeedbackContext, category_key: str) -> Optional[datetime]:
+        """Last entry time of a category; categories whose version changed are refreshed in one reverse scan."""
+        cached = self._last_activity.get(category_key)
+        if cached is None or cached[0] != context.category_versions[category_key]:
+            stale = [cat for cat in self.ai.categories
+                     if self._last_activity.get(cat, (None,))[0] != context.category_versions[cat]]
+            found = self.ai.get_last_activity_dates(reversed(context.log), stale)
+            for cat, last_date in found.items():
+                self._last_activity[cat] = (context.category_versions[cat], last_date)
+        return self._last_activity[category_key][1]
+
+
+@contextmanager
+def exclusive_file_lock(lock_path: str):
+    """Cross-process exclusive lock held on a small sidecar file for the duration of the block."""
+    with open(lock_path, 'a+b') as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue  # LK_LOCK gives up after ~10 s; keep waiting
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class ColdHistory:
+    """
+    What the rolling window mode keeps of entries it no longer holds in
+    memory: the running score state right after them (so scoring can
+    continue from there), each category's score at the end of every active
+    day (trend), the set of active days (streak) and the last entry time
+    per category (feedback, reminders). Its size grows with days, not entries.
+    """
+    def __init__(self, ai: PerformanceAI):
+        self.ai = ai
+        # Entries with an earlier timestamp have been folded in
+        self.cutoff = ''
+        self.count = 0
+        self.first_time: Optional[datetime] = None
+        self.scores = {cat: INITIAL_SCORE for cat in ai.categories}
+        self.last_times: Dict[str, datetime] = {}
+        self.last_activity: Dict[str, Optional[datetime]] = dict.fromkeys(ai.categories)
+        self.daily_history: Dict[str, List[Tuple[datetime, float]]] = {cat: [] for cat in ai.categories}
+        self.active_days = set()
+
+    @classmethod
+    def load(cls, ai: PerformanceAI, data_manager: 'DataManager', cutoff: datetime,
+             calendar: 'ActivityCalendar') -> Tuple['ColdHistory', List[Dict[str, Any]]]:
+        """
+        Streams the log from disk once. Entries before 'cutoff' are folded
+        into a new ColdHistory and the rest are returned as full records;
+        all of them are counted into 'calendar'. Like appends, folding
+        expects the file in chronological order, which DataManager maintains.
+        """
+        cold = cls(ai)
+        cold.cutoff = cutoff.isoformat()
+        recent = []
+        entries = data_manager.iter_log()
+        while True:
+            batch = list(itertools.islice(entries, FOLD_BATCH_SIZE))
+            if not batch:
+                return cold, recent
+            calendar.add_many(batch)
+            for entry in batch:
+                if entry['timestamp'] < cold.cutoff:
+                    cold.fold(entry)
+                else:
+                    recent.append(entry)
+
+    def fold(self, entry: Dict[str, Any]):
+        timestamp = datetime.fromisoformat(entry['timestamp'])
+        self.count += 1
+        self.first_time = self.first_time or timestamp
+        self.active_days.add(timestamp.date())
+        cat = entry.get('category')
+        if cat not in self.scores:
+            return
+        self.ai.apply_entry(self.scores, self.last_times, entry)
+        self.last_activity[cat] = timestamp
+        # One trend point per category and day: the score after that day's last entry
+        points = self.daily_history[cat]
+        if points and points[-1][0].date() == timestamp.date():
+            points[-1] = (timestamp, self.scores[cat])
+        else:
+            points.append((timestamp, self.scores[cat]))
+
+
+class ScoreLedger:
+    """
+    Chronological effective log plus everything derived from it that the UI
+    shows: running scores, trend points per category and the count of
+    entries per active day. The score state and the length of every trend
+    series are checkpointed every CHECKPOINT_INTERVAL entries. The 100-point
+    cap makes scores order-dependent, so editing or deleting an entry
+    restarts from the nearest checkpoint before it and replays only the
+    suffix; appending the newest entry costs O(1). 'snapshot()' reads the
+    result without walking the log.
+    Scoring starts from 'base', the summary of entries already folded out
+    of memory (see fold_before); it is empty unless the rolling window is on.
+    """
+    def __init__(self, ai: PerformanceAI, entries: Iterable[Dict[str, Any]], base: Optional[ColdHistory] = None):
+        self.ai = ai
+        self.base = base or ColdHistory(ai)
+        self.entries: List[Dict[str, Any]] = sorted(entries, key=lambda x: x['timestamp'])
+        self.timestamps = [entry['timestamp'] for entry in self.entries]
+        # checkpoint k holds the state before entry k * CHECKPOINT_INTERVAL is applied:
+        # scores, last times and the length of each category's trend series
+        self._checkpoints: List[Tuple[Dict[str, float], Dict[str, datetime], Dict[str, int]]] = []
+        self._scores: Dict[str, float] = {}
+        self._last_times: Dict[str, datetime] = {}
+        # Trend points of the entries in memory; 'base' holds the older, daily ones
+        self._history: Dict[str, List[Tuple[datetime, float]]] = {cat: [] for cat in ai.categories}
+        self._active_days = Counter(self._day(timestamp) for timestamp in self.timestamps)
+        self._replay_from(0)
+        # Data versions for memoized consumers (feedback rules); bumped per category on every change
+        self.version = new_data_version()
+        self.category_versions = {cat: self.version for cat in ai.categories}
+
+    @staticmethod
+    def _day(timestamp: str) -> date:
+        return date.fromisoformat(timestamp[:10])
+
+    def _touch(self, *category_keys: str):
+        self.version = new_data_version()
+        for cat in category_keys:
+            if cat in self.category_versions:
+                self.category_versions[cat] = self.version
+
+    def _count_day(self, timestamp: str, sign: int):
+        day = self._day(timestamp)
+        self._active_days[day] += sign
+        if not self._active_days[day]:
+            del self._active_days[day]
+
+    def _replay_from(self, index: int):
+        """Recomputes the running state for entries[index:] from the nearest earlier checkpoint."""
+        k = min(index // CHECKPOINT_INTERVAL, len(self._checkpoints) - 1)
+        if k < 0:
+            scores, last_times = dict(self.base.scores), dict(self.base.last_times)
+            lengths = dict.fromkeys(self.ai.categories, 0)
+            k = 0
+        else:
+            scores, last_times, lengths = dict(self._checkpoints[k][0]), dict(self._checkpoints[k][1]), self._checkpoints[k][2]
+        del self._checkpoints[k:]
+        for cat, points in self._history.items():
+            del points[lengths[cat]:]
+
+        for i in range(k * CHECKPOINT_INTERVAL, len(self.entries)):
+            if i % CHECKPOINT_INTERVAL == 0:
+                self._checkpoint(scores, last_times)
+            self.ai.apply_entry(scores, last_times, self.entries[i], self._history)
+        self._scores, self._last_times = scores, last_times
+
+    def _checkpoint(self, scores: Dict[str, float], last_times: Dict[str, datetime]):
+        lengths = {cat: len(points) for cat, points in self._history.items()}
+        self._checkpoints.append((dict(scores), dict(last_times), lengths))
+
+    def __contains__(self, entry_id: str) -> bool:
+        i = bisect.bisect_left(self.timestamps, entry_id)
+        return i < len(self.timestamps) and self.timestamps[i] == entry_id
+
+    def fold_before(self, cutoff: str) -> List[Dict[str, Any]]:
+        """Moves the entries older than 'cutoff' into the base summary and returns them."""
+        index = bisect.bisect_left(self.timestamps, cutoff)
+        self.base.cutoff = max(self.base.cutoff, cutoff)
+        if not index:
+            return []
+        folded = self.entries[:index]
+        for entry in folded:
+            self.base.fold(entry)
+            self._count_day(entry['timestamp'], -1)
+        del self.entries[:index]
+        del self.timestamps[:index]
+        # The base now holds the state the old checkpoints were built from
+        self._checkpoints = []
+        self._replay_from(0)
+        self._touch(*{entry['category'] for entry in folded})
+        return folded
+
+    def index_of(self, entry_id: str) -> int:
+        i = bisect.bisect_left(self.timestamps, entry_id)
+        if i == len(self.timestamps) or self.timestamps[i] != entry_id:
+            raise KeyError(entry_id)
+        return i
+
+    def current_scores(self, now: Optional[datetime] = None) -> Dict[str, float]:
+        return self.ai.decay_scores_to(self._scores, self._last_times, now or datetime.now())
+
+    def snapshot(self, now: Optional[datetime] = None) -> AnalyticsSnapshot:
+        """
+        Current scores, trend history, last activity per category, active
+        days and streak as of 'now'. Only the parts that depend on 'now'
+        are computed here; nothing walks or parses the log.
+        """
+        now = now or datetime.now()
+        current = self.current_scores(now)
+        # Every curve starts at INITIAL_SCORE, no later than 30 days ago, so the x values stay sorted
+        start = now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=30)
+        first_time = self.base.first_time or (datetime.fromisoformat(self.timestamps[0]) if self.timestamps else None)
+        if first_time:
+            start = min(start, first_time)
+
+        history, last_activity = {}, {}
+        for cat in self.ai.categories:
+            points = [(start, INITIAL_SCORE)] + self.base.daily_history[cat] + self._history[cat]
+            if cat in self._last_times and self.ai.half_lives[cat]:
+                # Extend decaying curves up to the present moment
+                points.append((now, current[cat]))
+            history[cat] = tuple(points)
+            # Every entry of a category ends with a trend point at its own time
+            last_activity[cat] = self._history[cat][-1][0] if self._history[cat] else self.base.last_activity[cat]
+
+        active_days = self.base.active_days.union(self._active_days)
+        return AnalyticsSnapshot(
+            now=now,
+            scores=MappingProxyType(current),
+            history=MappingProxyType(history),
+            last_activity=MappingProxyType(last_activity),
+            active_days=frozenset(active_days),
+            streak=self.ai.streak_from_days(active_days, now.date()),
+        )
+
+    def append(self, entry: Dict[str, Any]):
+        """Adds a new entry; O(1) when it is the newest one, which is the normal case."""
+        index = bisect.bisect_right(self.timestamps, entry['timestamp'])
+        self.entries.insert(index, entry)
+        self.timestamps.insert(index, entry['timestamp'])
+        self._count_day(entry['timestamp'], 1)
+        self._touch(entry['category'])
+        if index < len(self.entries) - 1:
+            self._replay_from(index)
+            return
+        if index % CHECKPOINT_INTERVAL == 0:
+            self._checkpoint(self._scores, self._last_times)
+        self.ai.apply_entry(self._scores, self._last_times, entry, self._history)
+
+    def edit(self, entry_id: str, new_entry: Dict[str, Any]):
+        index = self.index_of(entry_id)
+        self._touch(self.entries[index]['category'], new_entry['category'])
+        self._count_day(self.timestamps[index], -1)
+        self._count_day(new_entry['timestamp'], 1)
+        self.entries[index] = new_entry
+        self._replay_from(index)
+
+    def delete(self, entry_id: str):
+        index = self.index_of(entry_id)
+        self._touch(self.entries[index]['category'])
+        self._count_day(self.timestamps[index], -1)
+        del self.entries[index]
+        del self.timestamps[index]
+        self._replay_from(index)
+
+
+class HistoryIndex:
+    """
+    Chronological column arrays of the log (the ledger's entries, or the
+    whole file via from_columns), for browsing very long histories.
+    Filtering by category, activity and date range and sorting are
+    vectorized and return row positions, so a browser only has to build
+    widgets for the rows it shows; entry() turns one row back into an entry.
+    Keep it in step with the log through insert/replace/remove, or rebuild()
+    after a reload.
+    """
+    COLUMNS = ('time', 'category', 'activity', 'quantity', 'points')
+
+    def __init__(self, entries: List[Dict[str, Any]]):
+        self.rebuild(entries)
+
+    @classmethod
+    def from_columns(cls, columns: LogColumns) -> 'HistoryIndex':
+        """Index over LogColumns (e.g. DataManager.get_columns()); the arrays are copied, so memory maps can close."""
+        index = cls([])
+        order = np.argsort(columns.time, kind='stable')
+        index.time = np.asarray(columns.time, dtype=np.int64)[order]
+        index.category = np.asarray(columns.category, dtype=np.int32)[order]
+        index.activity = np.asarray(columns.activity, dtype=np.int32)[order]
+        index.quantity = np.asarray(columns.quantity, dtype=float)[order]
+        index.points = np.asarray(columns.points, dtype=float)[order]
+        index.category_ids = {key: i for i, key in enumerate(columns.category_keys)}
+        index.activity_ids = {key: i for i, key in enumerate(columns.activity_keys)}
+        return index
+
+    def rebuild(self, entries: List[Dict[str, Any]]):
+        self.category_ids: Dict[str, int] = {}
+        self.activity_ids: Dict[str, int] = {}
+        # ISO timestamps are parsed by numpy in one call
+        self.time = np.array([e['timestamp'] for e in entries], dtype='datetime64[us]').astype(np.int64)
+        self.category = np.array([self._id(self.category_ids, e['category']) for e in entries], dtype=np.int32)
+        self.activity = np.array([self._id(self.activity_ids, e['activity']) for e in entries], dtype=np.int32)
+        self.quantity = np.array([e.get('quantity', 0) for e in entries], dtype=float)
+        self.points = np.array([e.get('points', 0) for e in entries], dtype=float)
+
+    @staticmethod
+    def _id(ids: Dict[str, int], key: str) -> int:
+        return ids.setdefault(key, len(ids))
+
+    def _row(self, entry: Dict[str, Any]) -> Tuple[int, int, int, float, float]:
+        return (datetime_to_micros(datetime.fromisoformat(entry['timestamp'])),
+                self._id(self.category_ids, entry['category']), self._id(self.activity_ids, entry['activity']),
+                entry.get('quantity', 0), entry.get('points', 0))
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def columns(self) -> LogColumns:
+        """The indexed entries as LogColumns, without copying."""
+        return LogColumns(self.time, self.category, self.activity, self.quantity, self.points,
+                          list(self.category_ids), list(self.activity_ids))
+
+    def position_of(self, entry_id: str) -> Optional[int]:
+        micros = datetime_to_micros(datetime.fromisoformat(entry_id))
+        position = int(np.searchsorted(self.time, micros))
+        return position if position < len(self.time) and self.time[position] == micros else None
+
+    def entry(self, position: int) -> Dict[str, Any]:
+        return {
+            "timestamp": micros_to_datetime(int(self.time[position])).isoformat(),
+            "category": list(self.category_ids)[self.category[position]],
+            "activity": list(self.activity_ids)[self.activity[position]],
+            "quantity": float(self.quantity[position]),
+            "points": float(self.points[position]),
+        }
+
+    def insert(self, entry: Dict[str, Any]):
+        row = self._row(entry)
+        position = int(np.searchsorted(self.time, row[0], side='right'))
+        for name, value in zip(self.COLUMNS, row):
+            setattr(self, name, np.insert(getattr(self, name), position, value))
+
+    def replace(self, entry_id: str, entry: Dict[str, Any]):
+        position = self.position_of(entry_id)
+        if position is not None:
+            for name, value in zip(self.COLUMNS, self._row(entry)):
+                getattr(self, name)[position] = value
+
+    def remove(self, entry_id: str):
+        position = self.position_of(entry_id)
+        if position is not None:
+            for name in self.COLUMNS:
+                setattr(self, name, np.delete(getattr(self, name), position))
+
+    def drop_before(self, timestamp: str):
+        """Forgets the rows older than 'timestamp' (rolling window mode)."""
+        position = int(np.searchsorted(self.time, datetime_to_micros(datetime.fromisoformat(timestamp))))
+        for name in self.COLUMNS:
+            # Copy, so the dropped rows are actually freed
+            setattr(self, name, getattr(self, name)[position:].copy())
+
+    def query(self, category: Optional[str] = None, activity: Optional[str] = None,
+              start: Optional[datetime] = None, end: Optional[datetime] = None,
+              sort_by: str = 'time', descending: bool = True,
+              labels: Optional[Dict[str, str]] = None) -> np.ndarray:
+        """
+        Positions of the entries matching every given filter ('end' is
+        exclusive), ordered by 'sort_by'. Category and activity sort by their
+        label in 'labels' when given, otherwise by key.
+        """
+        # Entries are chronological, so the date range is a slice found by binary search
+        lo = int(np.searchsorted(self.time, datetime_to_micros(start))) if start else 0
+        hi = int(np.searchsorted(self.time, datetime_to_micros(end))) if end else len(self.time)
+        positions = np.arange(lo, max(lo, hi))
+
+        for column, ids, key in ((self.category, self.category_ids, category), (self.activity, self.activity_ids, activity)):
+            if key is not None:
+                if key not in ids:
+                    return positions[:0]
+                positions = positions[column[positions] == ids[key]]
+
+        if sort_by in ('category', 'activity'):
+            ids = self.category_ids if sort_by == 'category' else self.activity_ids
+            names = sorted(ids, key=lambda k: (labels or {}).get(k, k))
+            rank = np.empty(len(ids), dtype=np.int32)
+            rank[[ids[k] for k in names]] = np.arange(len(names))
+            values = rank[getattr(self, sort_by)[positions]]
+            positions = positions[np.argsort(values, kind='stable')]
+        elif sort_by != 'time':
+            positions = positions[np.argsort(getattr(self, sort_by)[positions], kind='stable')]
+        return positions[::-1] if descending else positions
+
+
+class ActivityCalendar:
+    """
+    Entry count and points per day and category, kept up to date entry by
+    entry, for the calendar heatmap. Rows are consecutive days starting at
+    'first_day' and grow as needed; columns follow 'categories'. Entries of
+    categories missing from config.json are not counted.
+    """
+    def __init__(self, categories: List[str], entries: List[Dict[str, Any]] = ()):
+        self.category_ids = {cat: i for i, cat in enumerate(categories)}
+        self.first_day = np.datetime64(date.today(), 'D')
+        self.counts = np.zeros((1, len(categories)), dtype=np.int32)
+        self.points = np.zeros((1, len(categories)), dtype=float)
+        self.add_many(entries)
+
+    def add_many(self, entries: List[Dict[str, Any]]):
+        """Counts a batch of entries in with one vectorized update."""
+        known = [e for e in entries if e['category'] in self.category_ids]
+        if not known:
+            return
+        days = np.array([e['timestamp'][:10] for e in known], dtype='datetime64[D]')
+        cats = np.array([self.category_ids[e['category']] for e in known], dtype=np.int64)
+        points = np.array([e.get('points', 0) for e in known], dtype=float)
+        # Grow both ends first; growing the front moves first_day
+        self._row(days.min())
+        self._row(days.max())
+        rows = (days - self.first_day).astype(np.int64)
+        np.add.at(self.counts, (rows, cats), 1)
+        np.add.at(self.points, (rows, cats), points)
+
+    def _row(self, day: np.datetime64) -> int:
+        """Row of a day, growing the arrays to the front or back when it is outside them."""
+        row = int((day - self.first_day).astype(int))
+        if row < 0:
+            self.counts = np.concatenate([np.zeros((-row, self.counts.shape[1]), np.int32), self.counts])
+            self.points = np.concatenate([np.zeros((-row, self.points.shape[1])), self.points])
+            self.first_day, row = day, 0
+        elif row >= len(self.counts):
+            # Grow by at least a year so appends do not copy the arrays every day
+            extra = max(row - len(self.counts) + 1, 366)
+            self.counts = np.concatenate([self.counts, np.zeros((extra, self.counts.shape[1]), np.int32)])
+            self.points = np.concatenate([self.points, np.zeros((extra, self.points.shape[1]))])
+        return row
+
+    def add(self, entry: Dict[str, Any], sign: int = 1) -> Optional[date]:
+        """Counts an entry in (sign=1) or out (sign=-1); returns its day, or None if not counted."""
+        cat = self.category_ids.get(entry['category'])
+        if cat is None:
+            return None
+        day = np.datetime64(entry['timestamp'][:10], 'D')
+        row = self._row(day)
+        self.counts[row, cat] += sign
+        self.points[row, cat] += sign * entry.get('points', 0)
+        return day.astype(date)
+
+    def _values(self, measure: str, category_key: Optional[str]) -> np.ndarray:
+        values = self.counts if measure == 'count' else self.points
+        if category_key is None:
+            return values.sum(axis=1)
+        return values[:, self.category_ids[category_key]]
+
+    def value(self, day: date, category_key: Optional[str] = None, measure: str = 'count') -> float:
+        row = int((np.datetime64(day, 'D') - self.first_day).astype(int))
+        if not 0 <= row < len(self.counts):
+            return 0.0
+        values = self.counts[row] if measure == 'count' else self.points[row]
+        return float(values.sum() if category_key is None else values[self.category_ids[category_key]])
+
+    def years(self) -> List[int]:
+        active = np.flatnonzero(self.counts.any(axis=1))
+        today = date.today().year
+        if not len(active):
+            return [today]
+        first = (self.first_day + active[0]).astype(date).year
+        last = (self.first_day + active[-1]).astype(date).year
+        return list(range(min(first, today), max(last, today) + 1))
+
+    @staticmethod
+    def cell(day: date) -> Tuple[int, int]:
+        """(weekday row, week column) of a day in its year's grid; weeks start on Monday."""
+        jan1 = date(day.year, 1, 1)
+        return day.weekday(), ((day - jan1).days + jan1.weekday()) // 7
+
+    def year_grid(self, year: int, category_key: Optional[str] = None, measure: str = 'count') -> np.ndarray:
+        """7 x 54 array (weekday x week) of one year, NaN where the cell is not a day of that year."""
+        jan1 = np.datetime64(f'{year}-01-01')
+        days = np.arange(jan1, np.datetime64(f'{year + 1}-01-01'))
+        rows = (days - self.first_day).astype(np.int64)
+        inside = (rows >= 0) & (rows < len(self.counts))
+        values = np.zeros(len(days))
+        values[inside] = self._values(measure, category_key)[rows[inside]]
+
+        # 1970-01-01 was a Thursday, so (day + 3) % 7 is the weekday with Monday = 0
+        weekdays = (days.astype(np.int64) + 3) % 7
+        weeks = (np.arange(len(days)) + weekdays[0]) // 7
+        grid = np.full((7, 54), np.nan)
+        grid[weekdays, weeks] = values
+        return grid
+
+
+class ReminderScheduler:
+    """
+    Background asyncio loop that sleeps until the next precomputed deadline
+    instead of polling: the moment each category reaches the AI's
+    'inactivity_days' without entries, and the moment the activity streak breaks (midnight
+    after the first full day without entries). Deadlines live in a heap;
+    a new entry reschedules only its own category and the streak, and
+    superseded heap items are skipped lazily by generation number.
+
+    'notifier(title, message)' is called from the scheduler thread. If it
+    raises, 'on_error(exception)' is called there instead and the scheduler
+    keeps running; without 'on_error' the exception ends the scheduler.
+    """
+    STREAK_KEY = ''
+
+    def __init__(self, ai: PerformanceAI, notifier: Callable[[str, str], None],
+                 on_error: Optional[Callable[[Exception], None]] = None):
+        self.ai = ai
+        self.notifier = notifier
+        self.on_error = on_error
+        self._heap: List[Tuple[datetime, int, str]] = []
+        self._generations: Dict[str, int] = defaultdict(int)
+        self._stopped = False
+        self._loop = asyncio.new_event_loop()
+        self._wakeup = asyncio.Event()
+        self._thread = threading.Thread(target=self._loop.run_until_complete, args=(self._run(),), daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._stop)
+
+    def reset(self, entries: List[Dict[str, Any]], older_last_dates: Optional[Dict[str, Optional[datetime]]] = None):
+        """
+        Recomputes every deadline from a chronological log (startup, reload,
+        delete). 'older_last_dates' covers categories whose entries are older
+        than 'entries' (rolling window mode).
+        """
+        last_dates = self.ai.get_last_activity_dates(reversed(entries))
+        for cat, last_date in (older_last_dates or {}).items():
+            if cat in last_dates and last_dates[cat] is None:
+                last_dates[cat] = last_date
+        newest = datetime.fromisoformat(entries[-1]['timestamp']) if entries else None
+        if newest is None and older_last_dates:
+            newest = max((d for d in older_last_dates.values() if d), default=None)
+        self._loop.call_soon_threadsafe(self._reset, last_dates, newest)
+
+    def on_activity(self, entry: Dict[str, Any]):
+        """Reschedules the category of a newly logged entry."""
+        timestamp = datetime.fromisoformat(entry['timestamp'])
+        self._loop.call_soon_threadsafe(self._schedule_activity, entry['category'], timestamp)
+
+    @staticmethod
+    def streak_deadline(last_activity: datetime) -> datetime:
+        # calculate_streak still counts yesterday, so the streak ends when the day after next begins
+        return datetime.combine(last_activity.date() + timedelta(days=2), datetime.min.time())
+
+    # --- Everything below runs on the scheduler thread ---
+    def _stop(self):
+        self._stopped = True
+        self._wakeup.set()
+
+    def _push(self, key: str, deadline: datetime):
+        self._generations[key] += 1
+        if deadline > datetime.now():
+            heapq.heappush(self._heap, (deadline, self._generations[key], key))
+
+    def _reset(self, last_dates: Dict[str, Optional[datetime]], newest: Optional[datetime]):
+        self._heap.clear()
+        for cat, last_date in last_dates.items():
+            if last_date:
+                self._push(cat, last_date + timedelta(days=self.ai.inactivity_days))
+        if newest:
+            self._push(self.STREAK_KEY, self.streak_deadline(newest))
+        self._wakeup.set()
+
+    def _schedule_activity(self, category_key: str, timestamp: datetime):
+        if category_key in self.ai.categories:
+            self._push(category_key, timestamp + timedelta(days=self.ai.inactivity_days))
+        self._push(self.STREAK_KEY, self.streak_deadline(timestamp))
+        self._wakeup.set()
+
+    def _fire(self, key: str):
+        if key == self.STREAK_KEY:
+            title, message = "🔥 Chuỗi ngày hoạt động", "Chuỗi ngày hoạt động của bạn vừa bị gián đoạn. Ghi nhận một hoạt động hôm nay để bắt đầu lại!"
+        else:
+            title = "⏰ Nhắc nhở"
+            message = f"Đã {self.ai.inactivity_days} ngày bạn chưa có hoạt động cho '{self.ai.config[key]['name']}'. Hãy dành ít phút cho nó nhé!"
+        try:
+            self.notifier(title, message)
+        except Exception as e:
+            if self.on_error is None:
+                raise
+            self.on_error(e)
+
+    async def _run(self):
+        while not self._stopped:
+            # Drop items superseded by a later reschedule of the same key
+            while self._heap and self._heap[0][1] != self._generations[self._heap[0][2]]:
+                heapq.heappop(self._heap)
+
+            delay = MAX_SCHEDULER_SLEEP
+            if self._heap:
+                deadline, _, key = self._heap[0]
+                delay = (deadline - datetime.now()).total_seconds()
+                if delay <= 0:
+                    heapq.heappop(self._heap)
+                    self._fire(key)
+                    continue
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), min(delay, MAX_SCHEDULER_SLEEP))
+            except asyncio.TimeoutError:
+                pass
+
+
 class DataManager:
-    """Handles loading and saving of the activity log."""
+    """
+    Handles loading and saving of the activity log.
+    A path ending in BINARY_LOG_EXTENSION selects the fixed-width binary
+    format instead of the JSON array; both expose the same methods.
+
+    Writers in any process serialize on '<log>.lock' and append in place.
+    Readers take no lock: a record still being written is simply not seen yet.
+    """
     def __init__(self, log_path: str):
         self.log_path = log_path
+        self.lock_path = log_path + '.lock'
+        self.binary = log_path.endswith(BINARY_LOG_EXTENSION)
+        # File version (size, mtime) as of our last full read or write, for the optimistic check
+        self.version: Optional[Tuple[int, int]] = None
+        # False when the last write found entries from another writer that we have not loaded
+        self.last_write_in_sync = True
+
+    def _current_version(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.log_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    # Entries are never rewritten: an edit or delete appends a tombstone
+    # {"op": "edit" | "delete", "target": <timestamp of the entry>, ...new fields}.
+    # The public readers below return the effective entries with tombstones applied.
+    @staticmethod
+    def resolve_tombstones(records: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Applies tombstones to raw records (oldest first); the latest tombstone of an entry wins."""
+        tombstones: Dict[str, Dict[str, Any]] = {}
+        entries = []
+        for record in records:
+            if 'op' in record:
+                tombstones[record['target']] = record
+            else:
+                entries.append(record)
+        if not tombstones:
+            return entries
+        return [resolved for resolved in (DataManager._apply_tombstone(entry, tombstones.get(entry['timestamp'])) for entry in entries)
+                if resolved is not None]
+
+    @staticmethod
+    def _apply_tombstone(entry: Dict[str, Any], tombstone: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if tombstone is None:
+            return entry
+        if tombstone['op'] == 'delete':
+            return None
+        # An edited entry keeps its identity (timestamp) and position in history
+        edited = {key: value for key, value in tombstone.items() if key not in ('op', 'target')}
+        return {"timestamp": entry['timestamp'], **edited}
+
+    def load_log(self) -> List[Dict[str, Any]]:
+        """Loads the entire activity log; a corrupt file raises json.JSONDecodeError."""
+        # Taken before reading: a write racing with the read shows up as a version mismatch later
+        self.version = self._current_version()
+        return self.resolve_tombstones(self._iter_records())
+
+    def iter_log(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yields the effective entries one at a time, oldest first, with bounded memory.
+        Tombstones may come after their target, so they are collected in a first pass.
+        Like load_log, streaming records the version the later writes are checked against.
+        """
+        self.version = self._current_version()
+        tombstones = self._collect_tombstones()
+        for record in self._iter_records():
+            if 'op' not in record:
+                entry = self._apply_tombstone(record, tombstones.get(record['timestamp']))
+                if entry is not None:
+                    yield entry
+
+    def iter_log_reversed(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yields the effective entries newest first by reading the file backwards.
+        Tombstones always follow their target, so they are applied on the fly.
+        Callers that only need the tail (recent entries, last activity,
+        streak) stop iterating early and never touch the older part of the file.
+        """
+        tombstones: Dict[str, Dict[str, Any]] = {}
+        for record in self._iter_records_reversed():
+            if 'op' in record:
+                tombstones.setdefault(record['target'], record)
+                continue
+            entry = self._apply_tombstone(record, tombstones.get(record['timestamp']))
+            if entry is not None:
+                yield entry
+
+    def _collect_tombstones(self) -> Dict[str, Dict[str, Any]]:
+        tombstones = {}
+        if self.binary:
+            records, header = self._map_binary_records()
+            records = records[records['kind'] != RECORD_KIND_ENTRY]
+            for record in self._binary_rows_to_dicts(records, header, reverse=False):
+                tombstones[record['target']] = record
+            return tombstones
+        for record in self._iter_records():
+            if 'op' in record:
+                tombstones[record['target']] = record
+        return tombstones
+
+    def _iter_records(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yields the raw records (entries and tombstones) one at a time, oldest first.
+        The file is decoded in LOG_READ_CHUNK_SIZE blocks, so memory stays
+        bounded by one block plus one entry however large the log is.
+        """
+        if not os.path.exists(self.log_path):
+            return
+        if self.binary:
+            yield from self._iter_binary_log(reverse=False)
+            return
+        decoder = json.JSONDecoder()
+        with open(self.log_path, 'r', encoding='utf-8') as f:
+            buf, pos = '', 0
+            # What the array grammar allows next: '[' , an entry or ']', ',' or ']', an entry
+            expect = 'open'
+            while True:
+                while pos < len(buf) and buf[pos] in ' \t\r\n':
+                    pos += 1
+                if pos == len(buf):
+                    more = f.read(LOG_READ_CHUNK_SIZE)
+                    if not more:
+                        if expect == 'entry':
+                            return  # a writer is appending right now; the rest is not there yet
+                        raise json.JSONDecodeError("Unexpected end of log file", buf, pos)
+                    buf, pos = more, 0
+                    continue
+
+                char = buf[pos]
+                if expect == 'open':
+                    if char != '[':
+                        raise json.JSONDecodeError("Activity log must be a JSON array", buf, pos)
+                    expect, pos = 'first', pos + 1
+                    continue
+                if char == ']' and expect != 'entry':
+                    return
+                if expect == 'separator':
+                    if char != ',':
+                        raise json.JSONDecodeError("Expecting ',' or ']' between log entries", buf, pos)
+                    expect, pos = 'entry', pos + 1
+                    continue
+                if char != '{':
+                    raise json.JSONDecodeError("Expecting a log entry object", buf, pos)
+
+                try:
+                    entry, pos = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    # The entry continues in the next block
+                    more = f.read(LOG_READ_CHUNK_SIZE)
+                    if not more:
+                        # Only the shape of an append in progress is tolerated: ",\n{..." with
+                        # the entry cut short. Anything else is a damaged file.
+                        if expect == 'entry' and '}' not in buf[pos:]:
+                            return
+                        raise
+                    buf, pos = buf[pos:] + more, 0
+                    continue
+                expect = 'separator'
+                yield entry
+
+    def _iter_records_reversed(self, block_size: int = LOG_READ_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+        """
+        Yields raw records newest first by reading the file backwards in blocks.
+        Raw records, tombstones included: see iter_log_reversed for entries.
+        """
+        if not os.path.exists(self.log_path):
+            return
+        if self.binary:
+            yield from self._iter_binary_log(reverse=True)
+            return
+        with open(self.log_path, 'rb') as f:
+            block_start = f.seek(0, os.SEEK_END)
+            # buf[:end] is the part of the file read so far that has not been yielded yet
+            buf, end = b'', 0
+            while True:
+                # Entries are flat objects: the last '}' always closes the last complete entry.
+                # Brace bytes never occur inside multi-byte UTF-8 sequences.
+                close = buf.rfind(b'}', 0, end)
+                start = buf.rfind(b'{', 0, close) if close != -1 else -1
+                entry = None
+                while start != -1:
+                    try:
+                        entry = json.loads(buf[start:close + 1])
+                        break
+                    except ValueError:
+                        # That '{' was inside a string value; try the previous one
+                        start = buf.rfind(b'{', 0, start)
+
+                if entry is None:
+                    if block_start == 0:
+                        if close != -1:
+                            raise json.JSONDecodeError("Corrupt entry in log file", buf.decode('utf-8', 'replace'), close)
+                        return
+                    read_size = min(block_size, block_start)
+                    block_start -= read_size
+                    f.seek(block_start)
+                    buf = f.read(read_size) + buf[:end]
+                    end = len(buf)
+                    continue
+
+                yield entry
+                end = start
+
+    def get_recent_log(self, since: datetime) -> List[Dict[str, Any]]:
+        """Returns the entries logged at or after 'since', oldest first, reading only the tail of the file."""
+        since_iso = since.isoformat()
+        recent = []
+        for entry in self.iter_log_reversed():
+            if entry['timestamp'] < since_iso:
+                break
+            recent.append(entry)
+        recent.reverse()
+        return recent
+
+    def get_columns(self) -> LogColumns:
+        """
+        Returns the log as column arrays. For binary logs the arrays are
+        zero-copy views into a read-only memory map of the file.
+        """
+        if not self.binary:
+            return LogColumns.from_entries(self.iter_log())
+        records, header = self._map_binary_records()
+        is_tombstone = records['kind'] != RECORD_KIND_ENTRY
+        if is_tombstone.any():
+            # Only logs with edits/deletes pay for a copy
+            records = self._apply_binary_tombstones(records[~is_tombstone], records[is_tombstone])
+        return LogColumns(
+            records['time'], records['category'], records['activity'],
+            records['quantity'], records['points'], header['categories'], header['activities']
+        )
+
+    def iter_column_chunks(self, chunk_size: int) -> Iterator[LogColumns]:
+        """
+        Yields the effective log as LogColumns of at most 'chunk_size' entries,
+        oldest first, so very large logs can be processed with bounded memory.
+        Ids in each chunk refer to that chunk's own key lists.
+        """
+        if not self.binary:
+            batch = []
+            for entry in self.iter_log():
+                batch.append(entry)
+                if len(batch) == chunk_size:
+                    yield LogColumns.from_entries(batch)
+                    batch = []
+            if batch:
+                yield LogColumns.from_entries(batch)
+            return
+
+        records, header = self._map_binary_records()
+        tombstones = records[records['kind'] != RECORD_KIND_ENTRY]
+        for start in range(0, len(records), chunk_size):
+            chunk = records[start:start + chunk_size]
+            if len(tombstones):
+                chunk = self._apply_binary_tombstones(chunk[chunk['kind'] == RECORD_KIND_ENTRY], tombstones)
+            yield LogColumns(
+                chunk['time'], chunk['category'], chunk['activity'],
+                chunk['quantity'], chunk['points'], header['categories'], header['activities']
+            )
+
+    # --- Binary format helpers ---
+    @staticmethod
+    def _apply_binary_tombstones(entries: np.ndarray, tombstones: np.ndarray) -> np.ndarray:
+        """Vectorized tombstone resolution on record arrays; the latest tombstone of an entry wins."""
+        latest = {int(t['time']): t for t in tombstones}
+        targeted = np.nonzero(np.isin(entries['time'], np.fromiter(latest, dtype=np.int64)))[0]
+        keep = np.ones(len(entries), dtype=bool)
+        for position in targeted:
+            tombstone = latest[int(entries['time'][position])]
+            if tombstone['kind'] == RECORD_KIND_DELETE:
+                keep[position] = False
+            else:
+                for field in ('category', 'activity', 'quantity', 'points'):
+                    entries[field][position] = tombstone[field]
+        return entries[keep]
+
+    def _read_binary_header(self, f) -> Tuple[int, Dict[str, List[str]]]:
+        """Returns (offset of the first record, id table) of an open binary log."""
+        f.seek(0)
+        preamble = f.read(BINARY_PREAMBLE.size)
+        if len(preamble) < BINARY_PREAMBLE.size:
+            raise ValueError(f"'{self.log_path}' is not a binary activity log")
+        magic, version, _, data_offset, header_length = BINARY_PREAMBLE.unpack(preamble)
+        if magic != BINARY_LOG_MAGIC or version != BINARY_LOG_VERSION:
+            raise ValueError(f"'{self.log_path}' is not a binary activity log (version {BINARY_LOG_VERSION})")
+        return data_offset, json.loads(f.read(header_length).decode('utf-8'))
+
+    def _write_binary_header(self, f, header: Dict[str, List[str]], data_offset: int) -> int:
+        """
+        Writes the id table in place. If it no longer fits before the first
+        record, the records are moved to a larger offset (rare, O(n)).
+        Returns the offset of the first record.
+        """
+        payload = json.dumps(header, ensure_ascii=False).encode('utf-8')
+        required = BINARY_PREAMBLE.size + len(payload)
+        if required > data_offset:
+            new_offset = max(data_offset, BINARY_HEADER_SIZE)
+            while new_offset < required:
+                new_offset *= 2
+            f.seek(data_offset)
+            records = f.read()
+            f.seek(new_offset)
+            f.write(records)
+            f.truncate()
+            data_offset = new_offset
+        f.seek(0)
+        f.write(BINARY_PREAMBLE.pack(BINARY_LOG_MAGIC, BINARY_LOG_VERSION, 0, data_offset, len(payload)))
+        f.write(payload)
+        f.write(b'\0' * (data_offset - required))
+        return data_offset
+
+    def _map_binary_records(self) -> Tuple[np.ndarray, Dict[str, List[str]]]:
+        """Memory-maps the records of the binary log as a read-only structured array."""
+        if not os.path.exists(self.log_path):
+            return np.empty(0, dtype=BINARY_RECORD_DTYPE), {"categories": [], "activities": []}
+        with open(self.log_path, 'rb') as f:
+            data_offset, header = self._read_binary_header(f)
+            size = f.seek(0, os.SEEK_END)
+        # A partially written trailing record is not part of the log
+        count = max(size - data_offset, 0) // BINARY_RECORD_DTYPE.itemsize
+        if count == 0:
+            return np.empty(0, dtype=BINARY_RECORD_DTYPE), header
+        return np.memmap(self.log_path, dtype=BINARY_RECORD_DTYPE, mode='r', offset=data_offset, shape=(count,)), header
+
+    def _iter_binary_log(self, reverse: bool) -> Iterator[Dict[str, Any]]:
+        records, header = self._map_binary_records()
+        batch = max(1, LOG_READ_CHUNK_SIZE // BINARY_RECORD_DTYPE.itemsize)
+        starts = range(0, len(records), batch)
+        for start in (reversed(starts) if reverse else starts):
+            yield from self._binary_rows_to_dicts(records[start:start + batch], header, reverse)
+
+    @staticmethod
+    def _binary_rows_to_dicts(records: np.ndarray, header: Dict[str, List[str]], reverse: bool) -> List[Dict[str, Any]]:
+        categories, activities = header['categories'], header['activities']
+        kind_names = {kind: op for op, kind in TOMBSTONE_KINDS.items()}
+        rows = list(zip(records['time'].tolist(), records['kind'].tolist(), records['category'].tolist(),
+                        records['activity'].tolist(), records['quantity'].tolist(), records['points'].tolist()))
+        if reverse:
+            rows.reverse()
+        result = []
+        for time, kind, category, activity, quantity, points in rows:
+            timestamp = micros_to_datetime(time).isoformat()
+            if kind == RECORD_KIND_DELETE:
+                result.append({"op": "delete", "target": timestamp})
+                continue
+            record = {
+                "timestamp": timestamp,
+                "category": categories[category],
+                "activity": activities[activity],
+                "quantity": quantity,
+                "points": points
+            }
+            if kind != RECORD_KIND_ENTRY:
+                record = {"op": kind_names[kind], "target": record.pop('timestamp'), **record}
+            result.append(record)
+        return result
+
+    def _append_binary_entries(self, entries: Iterable[Dict[str, Any]]):
+        """Appends records to the end of the binary log, creating it if needed."""
+        if not os.path.exists(self.log_path):
+            with open(self.log_path, 'wb') as f:
+                self._write_binary_header(f, {"categories": [], "activities": []}, BINARY_HEADER_SIZE)
+
+        with open(self.log_path, 'r+b') as f:
+            data_offset, header = self._read_binary_header(f)
+            ids = {field: {key: i for i, key in enumerate(header[field])} for field in ('categories', 'activities')}
+            record_size = BINARY_RECORD_DTYPE.itemsize
+            # Drop a torn record left by an interrupted write so new records stay aligned
+            end = f.seek(0, os.SEEK_END)
+            if (end - data_offset) % record_size:
+                f.truncate(data_offset + (end - data_offset) // record_size * record_size)
+
+            batch = max(1, LOG_READ_CHUNK_SIZE // record_size)
+            buffer = np.zeros(batch, dtype=BINARY_RECORD_DTYPE)
+            header_changed = False
+            count = 0
+            for entry in entries:
+                record = buffer[count]
+                record['kind'] = TOMBSTONE_KINDS.get(entry.get('op'), RECORD_KIND_ENTRY)
+                record['time'] = datetime_to_micros(datetime.fromisoformat(entry.get('target', entry.get('timestamp'))))
+                record['category'] = record['activity'] = 0
+                for field, column, key in (('categories', 'category', entry.get('category')),
+                                           ('activities', 'activity', entry.get('activity'))):
+                    if key is None:
+                        continue  # delete tombstones carry no category/activity
+                    if key not in ids[field]:
+                        ids[field][key] = len(header[field])
+                        header[field].append(key)
+                        header_changed = True
+                    record[column] = ids[field][key]
+                record['quantity'] = entry.get('quantity', 0)
+                record['points'] = entry.get('points', 0)
+                count += 1
+                if count == batch:
+                    f.seek(0, os.SEEK_END)
+                    f.write(buffer.tobytes())
+                    count = 0
+            f.seek(0, os.SEEK_END)
+            f.write(buffer[:count].tobytes())
+
+            if header_changed:
+                self._write_binary_header(f, header, data_offset)
+
+    @staticmethod
+    def _format_json_entry(entry: Dict[str, Any]) -> str:
+        """One entry formatted exactly as json.dump(log, indent=2) places it inside the array."""
+        return '  ' + json.dumps(entry, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+
+    @staticmethod
+    def convert_log(source_path: str, target_path: str):
+        """
+        Streams a log into the other storage format (JSON array <-> binary).
+        Tombstones are copied as they are. Timestamps, keys, quantities and
+        points survive the round trip exactly;
+        integer quantities/points come back as floats.
+        """
+        source, target = DataManager(source_path), DataManager(target_path)
+        if os.path.exists(target_path):
+            os.remove(target_path)
+        if target.binary:
+            target._append_binary_entries(source._iter_records())
+            return
+        with open(target_path, 'w', encoding='utf-8') as f:
+            first = True
+            for entry in source._iter_records():
+                f.write(('[\n' if first else ',\n') + DataManager._format_json_entry(entry))
+                first = False
+            f.write('[]' if first else '\n]')
 
     def get_full_log(self) -> List[Dict[str, Any]]:
         """Loads the entire activity log from the file."""
-        if not os.path.exists(self.log_path):
-            return []
         try:
-            with open(self.log_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, TypeError):
+            return self.load_log()
+        except (ValueError, TypeError):
             messagebox.showwarning("Cảnh báo", "File log bị lỗi. Sẽ tạo lại file mới.")
             return []
 
-    def log_activity(self, category: str, activity: str, quantity: float, points: float):
-        """Adds a new entry to the activity log."""
-        log = self.get_full_log()
+    def _append_records(self, records: List[Dict[str, Any]]):
+        """
+        Appends raw records (entries or tombstones) while holding the
+        cross-process lock. Sets last_write_in_sync to whether the file was
+        still at the version we last read or wrote (optimistic check); if not,
+        another writer appended in between and the caller should reload.
+        """
+        with exclusive_file_lock(self.lock_path):
+            in_sync = self._current_version() == self.version
+            self._keep_timestamps_increasing(records)
+            if self.binary:
+                # Fixed-width records: appending is a single write at the end of the file
+                self._append_binary_entries(records)
+            else:
+                self._append_json_records(records)
+            self.version = self._current_version() if in_sync else None
+        self.last_write_in_sync = in_sync
+
+    def _keep_timestamps_increasing(self, records: List[Dict[str, Any]]):
+        """
+        Timestamps are entry ids and the log is read as chronological, so a new
+        entry must sort after every existing one, including ones written by
+        another process in the same microsecond. Called with the lock held.
+        """
+        new_entries = [record for record in records if 'timestamp' in record]
+        if not new_entries:
+            return
+        last = self._last_entry_timestamp()
+        for entry in new_entries:
+            if last is not None and entry['timestamp'] <= last:
+                entry['timestamp'] = (datetime.fromisoformat(last) + timedelta(microseconds=1)).isoformat()
+            last = entry['timestamp']
+
+    def _last_entry_timestamp(self) -> Optional[str]:
+        """Timestamp of the newest raw entry (deleted ones included, their ids stay taken)."""
+        if not self.binary:
+            return next((record['timestamp'] for record in self._iter_records_reversed(block_size=4096)
+                         if 'timestamp' in record), None)
+        records, _ = self._map_binary_records()
+        for end in range(len(records), 0, -1024):
+            block = records[max(0, end - 1024):end]
+            positions = np.nonzero(block['kind'] == RECORD_KIND_ENTRY)[0]
+            if len(positions):
+                return micros_to_datetime(int(block['time'][positions[-1]])).isoformat()
+        return None
+
+    def _append_json_records(self, records: List[Dict[str, Any]]):
+        """Writes the records over the closing ']' of the array, so the cost does not depend on the log size."""
+        text = ',\n'.join(self._format_json_entry(record) for record in records).encode('utf-8')
+        if not os.path.exists(self.log_path) or os.path.getsize(self.log_path) == 0:
+            with open(self.log_path, 'wb') as f:
+                f.write(b'[\n' + text + b'\n]')
+            return
+
+        with open(self.log_path, 'r+b') as f:
+            size = f.seek(0, os.SEEK_END)
+            tail_start = max(0, size - 4096)
+            f.seek(tail_start)
+            tail = f.read().rstrip()
+            if tail.endswith(b']'):
+                body = tail[:-1].rstrip()
+                f.seek(tail_start + len(body))
+                f.write((b'\n' if body.endswith(b'[') else b',\n') + text + b'\n]')
+                f.truncate()
+                return
+
+        # No closing bracket: an earlier write was interrupted or the file is damaged
+        try:
+            log = list(self._iter_records())
+        except ValueError:
+            messagebox.showwarning("Cảnh báo", "File log bị lỗi. Sẽ tạo lại file mới.")
+            log = []
+        log.extend(records)
+        with open(self.log_path, 'w', encoding='utf-8') as f:
+            json.dump(log, f, indent=2, ensure_ascii=False)
+
+    def log_activity(self, category: str, activity: str, quantity: float, points: float) -> Dict[str, Any]:
+        """Adds a new entry to the activity log and returns it."""
         new_entry = {
             "timestamp": datetime.now().isoformat(),
             "category": category,
@@ -154,22 +1812,47 @@ class DataManager:
             "quantity": quantity,
             "points": points
         }
-        log.append(new_entry)
-        with open(self.log_path, 'w', encoding='utf-8') as f:
-            json.dump(log, f, indent=2, ensure_ascii=False)
+        self._append_records([new_entry])
+        return new_entry
+
+    def edit_entry(self, entry_id: str, category: str, activity: str, quantity: float, points: float) -> Dict[str, Any]:
+        """Records an edit tombstone for the entry with this timestamp and returns the entry as it now reads."""
+        self._append_records([{
+            "op": "edit",
+            "target": entry_id,
+            "category": category,
+            "activity": activity,
+            "quantity": quantity,
+            "points": points
+        }])
+        return {"timestamp": entry_id, "category": category, "activity": activity, "quantity": quantity, "points": points}
+
+    def delete_entry(self, entry_id: str):
+        """Records a delete tombstone for the entry with this timestamp."""
+        self._append_records([{"op": "delete", "target": entry_id}])
 
     def reset_log(self):
         """Deletes the log file."""
-        if os.path.exists(self.log_path):
-            os.remove(self.log_path)
+        with exclusive_file_lock(self.lock_path):
+            if os.path.exists(self.log_path):
+                os.remove(self.log_path)
+            self.version = None
 
 
 class Application(tk.Tk):
     """The main GUI application class."""
-    def __init__(self, ai: PerformanceAI, data_manager: DataManager):
+    def __init__(self, ai: PerformanceAI, data_manager: DataManager, window_days: Optional[int] = None):
         super().__init__()
         self.ai = ai
         self.data_manager = data_manager
+        # Rolling window mode: only the last 'window_days' days of entries stay in memory
+        self.window_days = window_days
+        # Whether the journal browses the whole file instead of the entries in memory
+        self.journal_full_history = False
+        # Tkinter marshals after() calls made from the scheduler thread onto the GUI thread
+        self.reminders = ReminderScheduler(ai, lambda title, message: self.after(0, self._show_reminder, title, message),
+                                           lambda e: self.after(0, self._show_reminder_error, e))
+        self.reminders.start()
         
         self._setup_window()
         self._load_data_and_init_ai()
@@ -179,11 +1862,54 @@ class Application(tk.Tk):
     def _setup_window(self):
         self.title(APP_TITLE)
         self.geometry(WINDOW_GEOMETRY)
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
+    def _on_close(self):
+        self.reminders.stop()
+        self.destroy()
 
     def _load_data_and_init_ai(self):
         """Loads data and calculates initial state."""
-        self.activity_log = self.data_manager.get_full_log()
-        self.scores = self.ai.calculate_scores_from_log(self.activity_log)
+        self.calendar = ActivityCalendar(self.ai.categories)
+        if self.window_days:
+            cold, entries = self._load_rolling_window()
+        else:
+            cold, entries = None, self.data_manager.get_full_log()
+            self.calendar.add_many(entries)
+        self.ledger = ScoreLedger(self.ai, entries, cold)
+        self.activity_log = self.ledger.entries
+        self.history = self._journal_index()
+        # Days whose heatmap cell changed since the last refresh; None means redraw everything
+        self.heatmap_pending: Optional[set] = None
+        # Whole-file index for the what-if tab in rolling window mode, read on demand
+        # and then kept in step with our own writes like self.history
+        self.what_if_index: Optional[HistoryIndex] = None
+        self.scores = self.ledger.current_scores()
+        self.reminders.reset(self.activity_log, self.ledger.base.last_activity)
+
+    def _window_cutoff(self) -> datetime:
+        """Start of the oldest day kept in memory in rolling window mode."""
+        return datetime.combine(date.today() - timedelta(days=self.window_days), datetime.min.time())
+
+    def _load_rolling_window(self) -> Tuple[Optional[ColdHistory], List[Dict[str, Any]]]:
+        try:
+            return ColdHistory.load(self.ai, self.data_manager, self._window_cutoff(), self.calendar)
+        except (ValueError, TypeError):
+            messagebox.showwarning("Cảnh báo", "File log bị lỗi. Sẽ tạo lại file mới.")
+            self.calendar = ActivityCalendar(self.ai.categories)
+            return None, []
+
+    def _roll_window(self):
+        """Folds the entries that have left the window (e.g. after midnight) into the summary."""
+        folded = self.ledger.fold_before(self._window_cutoff().isoformat())
+        if folded and not self.journal_full_history:
+            self.history.drop_before(self.ledger.base.cutoff)
+
+    def _journal_index(self) -> HistoryIndex:
+        if self.journal_full_history:
+            # Streams (or memory-maps) the whole file; only the compact columns are kept
+            return HistoryIndex.from_columns(self.data_manager.get_columns())
+        return HistoryIndex(self.activity_log)
 
     def _setup_ui(self):
         """Creates and arranges all UI widgets."""
@@ -220,7 +1946,12 @@ class Application(tk.Tk):
         self.fig_trend = plt.Figure(figsize=(6, 5), dpi=100)
         self.ax_trend = self.fig_trend.add_subplot(111)
         self.canvas_trend = FigureCanvasTkAgg(self.fig_trend, master=trend_tab)
+        # Toolbar gives zoom/pan; zooming re-samples the visible range at higher detail
+        NavigationToolbar2Tk(self.canvas_trend, trend_tab)
         self.canvas_trend.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.canvas_trend.mpl_connect('resize_event', lambda event: self._refresh_trend_lines())
+        self.trend_series: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.trend_lines: Dict[str, Any] = {}
 
         # AI Feedback Tab
         feedback_tab = ttk.Frame(notebook)
@@ -230,15 +1961,160 @@ class Application(tk.Tk):
         self.feedback_text = tk.Text(feedback_tab, wrap=tk.WORD, height=10, width=50, font=("Arial", 11), relief="flat", bg=self.cget('bg'))
         self.feedback_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
+        # Journal Tab: the whole history, paged on demand (filter, sort, edit/delete)
+        journal_tab = ttk.Frame(notebook)
+        notebook.add(journal_tab, text="🧾 Nhật Ký")
+        self._setup_journal(journal_tab)
+
+        # Heatmap Tab: one year of daily activity as a single image
+        heatmap_tab = ttk.Frame(notebook)
+        notebook.add(heatmap_tab, text="🗓️ Lịch Hoạt Động")
+        self._setup_heatmap(heatmap_tab)
+
+        # What-if Tab: the whole history re-scored under candidate config files
+        what_if_tab = ttk.Frame(notebook)
+        notebook.add(what_if_tab, text="🧪 Giả Lập")
+        self._setup_what_if(what_if_tab)
+
+    def _setup_what_if(self, what_if_tab: ttk.Frame):
+        # (file name, AI built from that config); results list the current config first
+        self.what_if_candidates: List[Tuple[str, PerformanceAI]] = []
+        self.what_if_results: List[WhatIfResult] = []
+
+        controls = ttk.Frame(what_if_tab)
+        controls.pack(side=tk.TOP, fill=tk.X, pady=5)
+        ttk.Button(controls, text="➕ Thêm cấu hình...", command=self._add_what_if_config).pack(side=tk.LEFT, padx=5)
+        ttk.Button(controls, text="Bỏ tất cả", command=self._clear_what_if_configs).pack(side=tk.LEFT)
+        ttk.Label(controls, text="Biểu đồ:").pack(side=tk.LEFT, padx=(15, 2))
+        self.what_if_category = ttk.Combobox(controls, state="readonly", width=16,
+                                             values=[self.ai.config[c]['name'] for c in self.ai.categories])
+        self.what_if_category.current(0)
+        self.what_if_category.pack(side=tk.LEFT)
+        self.what_if_category.bind('<<ComboboxSelected>>', lambda event: self._draw_what_if_chart())
+
+        self.what_if_table = ttk.Treeview(what_if_tab, show="headings", height=len(self.ai.categories) + 1)
+        self.what_if_table.pack(side=tk.TOP, fill=tk.X, padx=5)
+        self.fig_what_if = plt.Figure(figsize=(6, 3), dpi=100)
+        self.ax_what_if = self.fig_what_if.add_subplot(111)
+        self.canvas_what_if = FigureCanvasTkAgg(self.fig_what_if, master=what_if_tab)
+        self.canvas_what_if.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+    def _setup_heatmap(self, heatmap_tab: ttk.Frame):
+        controls = ttk.Frame(heatmap_tab)
+        controls.pack(side=tk.TOP, fill=tk.X, pady=5)
+        ttk.Label(controls, text="Năm:").pack(side=tk.LEFT)
+        self.heatmap_year = ttk.Combobox(controls, state="readonly", width=6, values=self.calendar.years())
+        self.heatmap_year.set(date.today().year)
+        self.heatmap_year.pack(side=tk.LEFT, padx=(2, 8))
+        ttk.Label(controls, text="Lĩnh vực:").pack(side=tk.LEFT)
+        self.heatmap_category = ttk.Combobox(controls, state="readonly", width=14,
+                                             values=[ALL_FILTER_LABEL] + [self.ai.config[c]['name'] for c in self.ai.categories])
+        self.heatmap_category.current(0)
+        self.heatmap_category.pack(side=tk.LEFT, padx=(2, 8))
+        ttk.Label(controls, text="Hiển thị:").pack(side=tk.LEFT)
+        self.heatmap_measure = ttk.Combobox(controls, state="readonly", width=8, values=[label for _, label in HEATMAP_MEASURES])
+        self.heatmap_measure.current(0)
+        self.heatmap_measure.pack(side=tk.LEFT, padx=(2, 8))
+        for combo in (self.heatmap_year, self.heatmap_category, self.heatmap_measure):
+            combo.bind('<<ComboboxSelected>>', lambda event: self._render_heatmap())
+
+        self.heatmap_summary = ttk.Label(heatmap_tab, text="")
+        self.heatmap_summary.pack(side=tk.BOTTOM, pady=5)
+        self.fig_heatmap = plt.Figure(figsize=(6, 2.2), dpi=100)
+        self.ax_heatmap = self.fig_heatmap.add_subplot(111)
+        self.canvas_heatmap = FigureCanvasTkAgg(self.fig_heatmap, master=heatmap_tab)
+        self.canvas_heatmap.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.heatmap_image = None
+        self.heatmap_grid = np.full((7, 54), np.nan)
+
+    def _setup_journal(self, journal_tab: ttk.Frame):
+        """
+        The Treeview only ever holds the rows that fit on screen. The scrollbar
+        drives an offset into self.journal_view (positions into the ledger's
+        entries, already filtered and sorted by the HistoryIndex).
+        """
+        self.journal_view = np.arange(0)
+        self.journal_offset = 0
+        self.journal_page_size = 1
+        self.journal_sort = ('time', True)
+        # Date range of the last successful "Lọc"; refreshes reuse it whatever the boxes hold now
+        self.journal_dates: Tuple[Optional[datetime], Optional[datetime]] = (None, None)
+        self.journal_selected: Optional[str] = None
+        self.journal_labels = {cat: self.ai.config[cat]['name'] for cat in self.ai.categories}
+        for cat in self.ai.categories:
+            self.journal_labels.update({act: info['name'] for act, info in self.ai.config[cat]['activities'].items()})
+
+        filters = ttk.Frame(journal_tab)
+        filters.pack(side=tk.TOP, fill=tk.X, pady=5)
+        ttk.Label(filters, text="Lĩnh vực:").pack(side=tk.LEFT)
+        self.journal_category = ttk.Combobox(filters, state="readonly", width=14,
+                                             values=[ALL_FILTER_LABEL] + [self.journal_labels[c] for c in self.ai.categories])
+        self.journal_category.current(0)
+        self.journal_category.pack(side=tk.LEFT, padx=(2, 8))
+        self.journal_category.bind('<<ComboboxSelected>>', lambda event: self._on_journal_category_selected())
+        ttk.Label(filters, text="Hoạt động:").pack(side=tk.LEFT)
+        self.journal_activity = ttk.Combobox(filters, state="readonly", width=18, values=[ALL_FILTER_LABEL])
+        self.journal_activity.current(0)
+        self.journal_activity.pack(side=tk.LEFT, padx=(2, 8))
+        self.journal_activity.bind('<<ComboboxSelected>>', lambda event: self._update_journal(from_top=True))
+        self.journal_activity_keys: List[Optional[str]] = [None]
+        ttk.Label(filters, text="Từ:").pack(side=tk.LEFT)
+        self.journal_start = ttk.Entry(filters, width=11)
+        self.journal_start.pack(side=tk.LEFT, padx=(2, 8))
+        ttk.Label(filters, text="Đến:").pack(side=tk.LEFT)
+        self.journal_end = ttk.Entry(filters, width=11)
+        self.journal_end.pack(side=tk.LEFT, padx=(2, 8))
+        ttk.Button(filters, text="Lọc", command=self._apply_journal_dates).pack(side=tk.LEFT)
+        ttk.Button(filters, text="Bỏ lọc", command=self._clear_journal_filters).pack(side=tk.LEFT, padx=5)
+        if self.window_days:
+            # Older entries are not in memory; this reads them from the file when asked
+            self.journal_full_var = tk.BooleanVar(value=self.journal_full_history)
+            ttk.Checkbutton(filters, text="Toàn bộ lịch sử", variable=self.journal_full_var,
+                            command=self._toggle_journal_full_history).pack(side=tk.LEFT)
+
+        journal_buttons = ttk.Frame(journal_tab)
+        journal_buttons.pack(side=tk.BOTTOM, fill=tk.X, pady=5)
+        ttk.Button(journal_buttons, text="✏️ Sửa", command=self._open_edit_entry_window).pack(side=tk.LEFT, padx=5)
+        ttk.Button(journal_buttons, text="🗑️ Xóa", command=self._handle_delete_entry).pack(side=tk.LEFT, padx=5)
+        self.journal_count = ttk.Label(journal_buttons, text="")
+        self.journal_count.pack(side=tk.RIGHT, padx=5)
+
+        ttk.Style(self).configure('Journal.Treeview', rowheight=JOURNAL_ROW_HEIGHT)
+        columns = HistoryIndex.COLUMNS
+        self.journal_tree = ttk.Treeview(journal_tab, columns=columns, show="headings", selectmode="browse",
+                                         style='Journal.Treeview')
+        self.journal_headings = dict(zip(columns, ("Thời gian", "Lĩnh vực", "Hoạt động", "Số lượng", "Điểm")))
+        for column, width in zip(columns, (130, 110, 170, 70, 60)):
+            self.journal_tree.heading(column, text=self.journal_headings[column], command=lambda c=column: self._sort_journal(c))
+            self.journal_tree.column(column, width=width, anchor='w' if column in ("category", "activity") else 'center')
+        self.journal_scroll = ttk.Scrollbar(journal_tab, orient=tk.VERTICAL, command=self._on_journal_scroll)
+        self.journal_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.journal_tree.pack(fill=tk.BOTH, expand=True)
+
+        self.journal_tree.bind('<Configure>', self._on_journal_resize)
+        self.journal_tree.bind('<<TreeviewSelect>>', self._on_journal_select)
+        self.journal_tree.bind('<MouseWheel>', lambda event: self._scroll_journal(-1 if event.delta > 0 else 1, 'units'))
+        self.journal_tree.bind('<Button-4>', lambda event: self._scroll_journal(-1, 'units'))
+        self.journal_tree.bind('<Button-5>', lambda event: self._scroll_journal(1, 'units'))
+        self.journal_tree.bind('<Prior>', lambda event: self._scroll_journal(-1, 'pages'))
+        self.journal_tree.bind('<Next>', lambda event: self._scroll_journal(1, 'pages'))
+
     def update_all_components(self):
         """A single method to refresh all parts of the UI."""
-        self.activity_log = self.data_manager.get_full_log()
-        self.scores = self.ai.calculate_scores_from_log(self.activity_log)
+        if self.window_days:
+            self._roll_window()
+        self.activity_log = self.ledger.entries
+        # The ledger keeps the derived state current; every component below reads this snapshot
+        self.snapshot = self.ledger.snapshot()
+        self.scores = self.snapshot.scores
         
         self._update_pie_chart()
         self._update_trend_chart()
         self._update_ai_feedback()
         self._update_streak_counter()
+        self._update_journal()
+        self._update_heatmap()
+        self._update_what_if()
 
     def _update_pie_chart(self):
         self.ax_pie.clear()
@@ -246,7 +2122,7 @@ class Application(tk.Tk):
         values = [self.scores[key] for key in self.ai.categories]
         
         # Calculate overall score based on current scores
-        overall_score = sum(s * self.ai.config[c].get('weight', 0) for c, s in self.scores.items())
+        overall_score = self.ai.calculate_overall_score(self.scores)
 
         wedges, _, _ = self.ax_pie.pie(
             values, autopct='%1.1f%%', startangle=140, pctdistance=0.85,
@@ -264,30 +2140,326 @@ class Application(tk.Tk):
 
     def _update_trend_chart(self):
         self.ax_trend.clear()
-        historical_data = self.ai.get_historical_scores(self.activity_log)
+        historical_data = self.snapshot.history
+        self.trend_series = {}
+        self.trend_lines = {}
         for category, data_points in historical_data.items():
             if len(data_points) > 1:
                 dates, scores = zip(*data_points)
-                self.ax_trend.plot(dates, scores, marker='o', linestyle='-', markersize=4, label=self.ai.config[category]['name'])
-        
+                x, y = mdates.date2num(dates), np.asarray(scores, dtype=float)
+                self.trend_series[category] = (x, y)
+                x_view, y_view = downsample_lttb(x, y, self._trend_point_budget())
+                line, = self.ax_trend.plot(x_view, y_view, marker='o', linestyle='-', markersize=4, label=self.ai.config[category]['name'])
+                self.trend_lines[category] = line
+
+        self.ax_trend.xaxis_date()
         self.ax_trend.set_title("Lịch Sử Tiến Bộ", fontsize=14)
         self.ax_trend.set_ylabel("Điểm số")
         self.ax_trend.legend(fontsize='small')
         self.ax_trend.tick_params(axis='x', rotation=30)
         self.fig_trend.tight_layout()
+        # clear() drops axes callbacks, so re-register after every rebuild
+        self.ax_trend.callbacks.connect('xlim_changed', lambda ax: self._refresh_trend_lines())
         self.canvas_trend.draw()
 
+    def _trend_point_budget(self) -> int:
+        """One point per horizontal pixel of the plotting area."""
+        width = self.ax_trend.get_window_extent().width
+        return max(MIN_TREND_POINTS, int(width))
+
+    def _refresh_trend_lines(self):
+        """Re-samples only the visible part of each series after a zoom, pan or resize."""
+        if not self.trend_lines:
+            return
+        x_min, x_max = self.ax_trend.get_xlim()
+        budget = self._trend_point_budget()
+        for category, line in self.trend_lines.items():
+            x, y = self.trend_series[category]
+            # Keep one point beyond each edge so the line runs off-screen instead of stopping short
+            lo = max(int(np.searchsorted(x, x_min)) - 1, 0)
+            hi = min(int(np.searchsorted(x, x_max, side='right')) + 1, len(x))
+            line.set_data(*downsample_lttb(x[lo:hi], y[lo:hi], budget))
+        self.canvas_trend.draw_idle()
+
     def _update_ai_feedback(self):
-        feedback = self.ai.get_ai_feedback(self.scores, self.activity_log)
+        feedback = self.ai.get_ai_feedback(self.scores, self.activity_log, self.ledger.category_versions,
+                                           self.ledger.version, snapshot=self.snapshot)
         self.feedback_text.config(state=tk.NORMAL)
         self.feedback_text.delete('1.0', tk.END)
         self.feedback_text.insert(tk.END, feedback)
         self.feedback_text.config(state=tk.DISABLED)
 
     def _update_streak_counter(self):
-        streak = self.ai.calculate_streak(self.activity_log)
+        streak = self.snapshot.streak
         self.streak_label.config(text=f"🔥 Chuỗi: {streak} ngày")
 
+    def _update_journal(self, from_top: bool = False):
+        """Re-runs the current filters and sort over the history index and shows the current (or first) page."""
+        start, end = self.journal_dates
+        category_index = self.journal_category.current()
+        sort_by, descending = self.journal_sort
+        self.journal_view = self.history.query(
+            category=self.ai.categories[category_index - 1] if category_index > 0 else None,
+            activity=self.journal_activity_keys[max(self.journal_activity.current(), 0)],
+            start=start, end=end + timedelta(days=1) if end else None,
+            sort_by=sort_by, descending=descending, labels=self.journal_labels,
+        )
+        self.journal_count.config(text=f"{len(self.journal_view)} mục")
+        if from_top:
+            self.journal_offset = 0
+        self._render_journal_page()
+
+    def _apply_journal_dates(self):
+        """Validates the date boxes and filters by them."""
+        try:
+            self.journal_dates = (self._parse_journal_date(self.journal_start.get()),
+                                  self._parse_journal_date(self.journal_end.get()))
+        except ValueError:
+            messagebox.showerror("Lỗi", "Ngày phải có dạng dd/mm/yyyy.", parent=self)
+            return
+        self._update_journal(from_top=True)
+
+    @staticmethod
+    def _parse_journal_date(text: str) -> Optional[datetime]:
+        text = text.strip()
+        return datetime.strptime(text, JOURNAL_DATE_FORMAT) if text else None
+
+    def _toggle_journal_full_history(self):
+        self.journal_full_history = self.journal_full_var.get()
+        self.history = self._journal_index()
+        self._update_journal(from_top=True)
+
+    def _clear_journal_filters(self):
+        self.journal_category.current(0)
+        self._on_journal_category_selected(refresh=False)
+        self.journal_start.delete(0, tk.END)
+        self.journal_end.delete(0, tk.END)
+        self.journal_dates = (None, None)
+        self._update_journal(from_top=True)
+
+    def _on_journal_category_selected(self, refresh: bool = True):
+        """Offers the activities of the chosen category in the activity filter."""
+        category_index = self.journal_category.current()
+        activities = self.ai.config[self.ai.categories[category_index - 1]]['activities'] if category_index > 0 else {}
+        self.journal_activity_keys = [None] + list(activities)
+        self.journal_activity.config(values=[ALL_FILTER_LABEL] + [a['name'] for a in activities.values()])
+        self.journal_activity.current(0)
+        if refresh:
+            self._update_journal(from_top=True)
+
+    def _sort_journal(self, column: str):
+        """Sorts by a column; clicking the same heading again flips the direction."""
+        sort_by, descending = self.journal_sort
+        self.journal_sort = (column, not descending if column == sort_by else column == 'time')
+        for name, heading in self.journal_headings.items():
+            arrow = (" ▼" if self.journal_sort[1] else " ▲") if name == column else ""
+            self.journal_tree.heading(name, text=heading + arrow)
+        self._update_journal(from_top=True)
+
+    def _render_journal_page(self):
+        """Fills the Treeview with the visible slice of the view and updates the scrollbar."""
+        total = len(self.journal_view)
+        self.journal_offset = max(0, min(self.journal_offset, total - self.journal_page_size))
+        page = self.journal_view[self.journal_offset:self.journal_offset + self.journal_page_size]
+
+        self.journal_tree.delete(*self.journal_tree.get_children())
+        for position in page.tolist():
+            entry = self.history.entry(position) if self.journal_full_history else self.activity_log[position]
+            # The entry's timestamp is its id for edits and deletes
+            self.journal_tree.insert('', tk.END, iid=entry['timestamp'], values=self._format_entry_row(entry))
+        if self.journal_selected and self.journal_tree.exists(self.journal_selected):
+            self.journal_tree.selection_set(self.journal_selected)
+
+        if total:
+            self.journal_scroll.set(self.journal_offset / total, (self.journal_offset + len(page)) / total)
+        else:
+            self.journal_scroll.set(0, 1)
+
+    def _scroll_journal(self, amount: int, what: str):
+        step = self.journal_page_size if what == 'pages' else 1
+        self.journal_offset += amount * step
+        self._render_journal_page()
+        return "break"
+
+    def _on_journal_scroll(self, action: str, *args):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units'|'pages')."""
+        if action == 'moveto':
+            self.journal_offset = int(float(args[0]) * len(self.journal_view))
+            self._render_journal_page()
+        else:
+            self._scroll_journal(int(args[0]), args[1])
+
+    def _on_journal_resize(self, event):
+        page_size = max(1, (event.height - JOURNAL_HEADER_HEIGHT) // JOURNAL_ROW_HEIGHT)
+        if page_size != self.journal_page_size:
+            self.journal_page_size = page_size
+            self._render_journal_page()
+
+    def _on_journal_select(self, event):
+        selection = self.journal_tree.selection()
+        if selection:
+            self.journal_selected = selection[0]
+
+    def _heatmap_selection(self) -> Tuple[int, Optional[str], str]:
+        category_index = self.heatmap_category.current()
+        category = self.ai.categories[category_index - 1] if category_index > 0 else None
+        return int(self.heatmap_year.get()), category, HEATMAP_MEASURES[max(self.heatmap_measure.current(), 0)][0]
+
+    def _update_heatmap(self):
+        """Redraws only the cells of the days that changed, unless a full redraw is needed."""
+        pending, self.heatmap_pending = self.heatmap_pending, set()
+        if self.heatmap_image is None or pending is None:
+            self._render_heatmap()
+            return
+        year, category, measure = self._heatmap_selection()
+        changed = [day for day in pending if day.year == year]
+        if not changed:
+            return
+        for day in changed:
+            self.heatmap_grid[self.calendar.cell(day)] = self.calendar.value(day, category, measure)
+        low, high = self.heatmap_image.get_clim()
+        if np.nanmax(self.heatmap_grid) > high or np.nanmin(self.heatmap_grid) < low:
+            # The colour scale changes, so every cell changes colour
+            self._render_heatmap()
+            return
+        self.heatmap_image.set_data(self.heatmap_grid)
+        self.ax_heatmap.draw_artist(self.heatmap_image)
+        self.canvas_heatmap.blit(self.ax_heatmap.bbox)
+        self._update_heatmap_summary(year, measure)
+
+    def _render_heatmap(self):
+        """Draws the selected year as one image: rows are weekdays, columns are weeks."""
+        self.heatmap_pending = set()
+        self.heatmap_year.config(values=self.calendar.years())
+        year, category, measure = self._heatmap_selection()
+        self.heatmap_grid = self.calendar.year_grid(year, category, measure)
+
+        self.ax_heatmap.clear()
+        self.ax_heatmap.grid(False)
+        self.heatmap_image = self.ax_heatmap.imshow(
+            self.heatmap_grid, cmap=HEATMAP_CMAP, interpolation='nearest', aspect='equal',
+            vmin=min(0.0, float(np.nanmin(self.heatmap_grid))), vmax=max(1.0, float(np.nanmax(self.heatmap_grid)))
+        )
+        self.ax_heatmap.set_yticks(range(7), WEEKDAY_LABELS, fontsize=7)
+        month_starts = [self.calendar.cell(date(year, month, 1))[1] for month in range(1, 13)]
+        self.ax_heatmap.set_xticks(month_starts, [f"Th{month}" for month in range(1, 13)], fontsize=7)
+        self.ax_heatmap.tick_params(length=0)
+        self.ax_heatmap.set_title(f"Hoạt động năm {year}", fontsize=12)
+        self.fig_heatmap.tight_layout()
+        self.canvas_heatmap.draw()
+        self._update_heatmap_summary(year, measure)
+
+    def _update_heatmap_summary(self, year: int, measure: str):
+        active_days = int(np.count_nonzero(np.nan_to_num(self.heatmap_grid)))
+        total = np.nansum(self.heatmap_grid)
+        total_text = f"{int(total)} hoạt động" if measure == 'count' else f"{total:.1f} điểm"
+        self.heatmap_summary.config(text=f"{year}: {total_text} trong {active_days} ngày")
+
+    def _add_what_if_config(self):
+        path = filedialog.askopenfilename(parent=self, title="Chọn file cấu hình để so sánh",
+                                          filetypes=[("JSON", "*.json"), ("Tất cả", "*.*")])
+        if not path:
+            return
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                candidate = PerformanceAI(json.load(f))
+            # A config that cannot score the history would break every later refresh
+            candidate.what_if(self._what_if_source())
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            messagebox.showerror("Lỗi", f"Không thể dùng file '{os.path.basename(path)}': {e}", parent=self)
+            return
+        self.what_if_candidates.append((os.path.basename(path), candidate))
+        self._update_what_if()
+
+    def _clear_what_if_configs(self):
+        self.what_if_candidates = []
+        self._update_what_if()
+
+    def _what_if_source(self) -> LogColumns:
+        """The whole history as columns: the in-memory index, or the file in rolling window mode."""
+        if not self.window_days or self.journal_full_history:
+            return self.history.columns()
+        if self.what_if_index is None:
+            # A copy, not the memory map itself: a live map would block resetting or truncating the file
+            self.what_if_index = HistoryIndex.from_columns(self.data_manager.get_columns())
+        return self.what_if_index.columns()
+
+    def _update_what_if(self):
+        """Re-scores the history under the current config and every candidate, then fills the table."""
+        if not self.what_if_candidates:
+            self.what_if_results = []
+        else:
+            columns = self._what_if_source()
+            now = datetime.now()
+            # The current config keeps the points stored at logging time; candidates reprice the quantities
+            self.what_if_results = [self.ai.what_if(columns, now, reprice=False)] + [
+                candidate.what_if(columns, now) for _, candidate in self.what_if_candidates
+            ]
+
+        labels = ["Hiện tại"] + [label for label, _ in self.what_if_candidates]
+        columns = ["category"] + [f"config{i}" for i in range(len(labels))]
+        self.what_if_table.configure(columns=columns)
+        self.what_if_table.heading("category", text="Lĩnh vực")
+        self.what_if_table.column("category", width=130, anchor='w')
+        for column, label in zip(columns[1:], labels):
+            self.what_if_table.heading(column, text=label)
+            self.what_if_table.column(column, width=110, anchor='center')
+
+        self.what_if_table.delete(*self.what_if_table.get_children())
+        rows = [(self.ai.config[c]['name'], [r.scores.get(c) for r in self.what_if_results]) for c in self.ai.categories]
+        rows.append(("Tổng thể", [r.overall for r in self.what_if_results]))
+        for name, values in rows:
+            cells = [name]
+            for i, value in enumerate(values):
+                if value is None:
+                    cells.append("—")
+                elif i == 0 or values[0] is None:
+                    cells.append(f"{value:.1f}")
+                else:
+                    cells.append(f"{value:.1f} ({value - values[0]:+.1f})")
+            self.what_if_table.insert('', tk.END, values=cells)
+        self._draw_what_if_chart()
+
+    def _draw_what_if_chart(self):
+        """History of the chosen category under each config, downsampled like the trend chart."""
+        self.ax_what_if.clear()
+        category = self.ai.categories[max(self.what_if_category.current(), 0)]
+        labels = ["Hiện tại"] + [label for label, _ in self.what_if_candidates]
+        for label, result in zip(labels, self.what_if_results):
+            if category in result.history:
+                times, values = result.history[category]
+                x = mdates.date2num(times.astype('datetime64[us]'))
+                self.ax_what_if.plot(*downsample_lttb(x, values, WHAT_IF_TREND_POINTS), linestyle='-', label=label)
+        if self.what_if_results:
+            self.ax_what_if.legend(fontsize='small')
+        else:
+            self.ax_what_if.text(0.5, 0.5, "Thêm một file cấu hình để so sánh", ha='center', va='center',
+                                 transform=self.ax_what_if.transAxes)
+        self.ax_what_if.xaxis_date()
+        self.ax_what_if.set_ylabel("Điểm số")
+        self.ax_what_if.set_title(f"So sánh: {self.ai.config[category]['name']}", fontsize=12)
+        self.fig_what_if.tight_layout()
+        self.canvas_what_if.draw()
+
+    def _format_entry_row(self, entry: Dict[str, Any]) -> Tuple[str, str, str, str, str]:
+        category = self.ai.config.get(entry['category'], {})
+        activity = category.get('activities', {}).get(entry['activity'], {})
+        return (
+            datetime.fromisoformat(entry['timestamp']).strftime('%d/%m/%Y %H:%M'),
+            category.get('name', entry['category']),
+            activity.get('name', entry['activity']),
+            f"{entry.get('quantity', 0):g}",
+            f"{entry.get('points', 0):.1f}",
+        )
+
+    def _show_reminder(self, title: str, message: str):
+        # A new snapshot as of now, so the feedback and streak show what the reminder announces
+        self.update_all_components()
+        messagebox.showwarning(title, message, parent=self)
+
+    def _show_reminder_error(self, error: Exception):
+        messagebox.showerror("Lỗi", f"Không thể hiển thị nhắc nhở: {error}", parent=self)
+
     def _on_pie_click(self, event):
         # (This function remains largely the same as before)
         if event.inaxes != self.ax_pie: return
@@ -334,26 +2506,145 @@ class Application(tk.Tk):
         ))
         log_button.pack(pady=15)
 
-    def _handle_log_submission(self, window: tk.Toplevel, cat_key: str, act_key: str, quantity_str: str):
+    @staticmethod
+    def _parse_quantity(quantity_str: str, window: tk.Toplevel) -> Optional[float]:
         try:
             quantity = float(quantity_str)
             if quantity <= 0:
                 messagebox.showerror("Lỗi", "Số lượng phải là một số dương.", parent=window)
-                return
+                return None
         except ValueError:
             messagebox.showerror("Lỗi", "Vui lòng nhập một số hợp lệ.", parent=window)
+            return None
+        return quantity
+
+    def _handle_log_submission(self, window: tk.Toplevel, cat_key: str, act_key: str, quantity_str: str):
+        quantity = self._parse_quantity(quantity_str, window)
+        if quantity is None:
             return
 
         improvement = self.ai.calculate_improvement(cat_key, act_key, quantity)
-        self.data_manager.log_activity(cat_key, act_key, quantity, improvement)
+        entry = self.data_manager.log_activity(cat_key, act_key, quantity, improvement)
+        self._sync_ledger(lambda: self._apply_append(entry))
+        self.reminders.on_activity(entry)
         
         window.destroy()
         self.update_all_components() # Refresh everything
         messagebox.showinfo("Thành công!", f"Đã ghi nhận thành công!")
 
+    def _sync_ledger(self, apply_change, entry_id: Optional[str] = None):
+        """
+        Applies our own write incrementally, or reloads if another process
+        wrote to the log meanwhile or the changed entry was already folded
+        out of memory (rolling window mode).
+        """
+        if self.data_manager.last_write_in_sync and (entry_id is None or entry_id in self.ledger):
+            apply_change()
+        else:
+            self._load_data_and_init_ai()
+
+    # The ledger and the history indexes change together, entry by entry
+    def _indexes(self) -> List[HistoryIndex]:
+        return [self.history] + ([self.what_if_index] if self.what_if_index is not None else [])
+
+    def _apply_append(self, entry: Dict[str, Any]):
+        self.ledger.append(entry)
+        for index in self._indexes():
+            index.insert(entry)
+        self._count_in_calendar(entry, 1)
+
+    def _apply_edit(self, entry_id: str, new_entry: Dict[str, Any]):
+        self._count_in_calendar(self.ledger.entries[self.ledger.index_of(entry_id)], -1)
+        self.ledger.edit(entry_id, new_entry)
+        for index in self._indexes():
+            index.replace(entry_id, new_entry)
+        self._count_in_calendar(new_entry, 1)
+
+    def _apply_delete(self, entry_id: str):
+        self._count_in_calendar(self.ledger.entries[self.ledger.index_of(entry_id)], -1)
+        self.ledger.delete(entry_id)
+        for index in self._indexes():
+            index.remove(entry_id)
+
+    def _count_in_calendar(self, entry: Dict[str, Any], sign: int):
+        day = self.calendar.add(entry, sign)
+        if day is not None and self.heatmap_pending is not None:
+            self.heatmap_pending.add(day)
+
+    def _selected_entry(self) -> Optional[Dict[str, Any]]:
+        # The selected row may have been scrolled out of the Treeview, so the id is kept separately
+        if self.journal_selected is not None:
+            if self.journal_selected in self.ledger:
+                return self.ledger.entries[self.ledger.index_of(self.journal_selected)]
+            # Older than the rolling window: only the journal's full-history index has it
+            position = self.history.position_of(self.journal_selected)
+            if position is not None:
+                return self.history.entry(position)
+        messagebox.showinfo("Nhật ký", "Hãy chọn một mục trong nhật ký trước.")
+        return None
+
+    def _open_edit_entry_window(self):
+        entry = self._selected_entry()
+        if entry is None:
+            return
+        category_key = entry['category']
+        if category_key not in self.ai.categories:
+            messagebox.showerror("Lỗi", "Lĩnh vực của mục này không còn trong file cấu hình.")
+            return
+
+        edit_window = tk.Toplevel(self)
+        edit_window.title(f"Sửa mục: {self.ai.config[category_key]['name']}")
+        edit_window.geometry("350x200")
+        edit_window.transient(self)
+        edit_window.grab_set()
+
+        frame = ttk.Frame(edit_window, padding="15")
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        ttk.Label(frame, text="Hoạt động:").pack(anchor='w')
+        activities = self.ai.config[category_key]['activities']
+        activity_keys = list(activities.keys())
+        activity_combo = ttk.Combobox(frame, values=[act['name'] for act in activities.values()], state="readonly")
+        activity_combo.pack(fill=tk.X, pady=5)
+        activity_combo.current(activity_keys.index(entry['activity']) if entry['activity'] in activities else 0)
+
+        ttk.Label(frame, text="Số lượng:").pack(anchor='w', pady=(10, 0))
+        quantity_entry = ttk.Entry(frame)
+        quantity_entry.insert(0, f"{entry.get('quantity', 0):g}")
+        quantity_entry.pack(fill=tk.X)
+
+        ttk.Button(frame, text="Lưu thay đổi", command=lambda: self._handle_edit_submission(
+            edit_window, entry, activity_keys[activity_combo.current()], quantity_entry.get()
+        )).pack(pady=15)
+
+    def _handle_edit_submission(self, window: tk.Toplevel, entry: Dict[str, Any], act_key: str, quantity_str: str):
+        quantity = self._parse_quantity(quantity_str, window)
+        if quantity is None:
+            return
+
+        cat_key = entry['category']
+        improvement = self.ai.calculate_improvement(cat_key, act_key, quantity)
+        edited = self.data_manager.edit_entry(entry['timestamp'], cat_key, act_key, quantity, improvement)
+        self._sync_ledger(lambda: self._apply_edit(entry['timestamp'], edited), entry['timestamp'])
+
+        window.destroy()
+        self.update_all_components()
+
+    def _handle_delete_entry(self):
+        entry = self._selected_entry()
+        if entry is None:
+            return
+        if messagebox.askyesno("Xác nhận xóa", "Xóa mục này khỏi lịch sử? Điểm số sẽ được tính lại."):
+            self.data_manager.delete_entry(entry['timestamp'])
+            self._sync_ledger(lambda: self._apply_delete(entry['timestamp']), entry['timestamp'])
+            # The deleted entry may have been the last one of its category
+            self.reminders.reset(self.activity_log, self.ledger.base.last_activity)
+            self.update_all_components()
+
     def _handle_reset(self):
         if messagebox.askyesno("Xác nhận Reset", "Hành động này sẽ XÓA TOÀN BỘ LỊCH SỬ hoạt động của bạn và không thể hoàn tác. Bạn có chắc chắn?"):
             self.data_manager.reset_log()
+            self._load_data_and_init_ai()
             self.update_all_components()
             messagebox.showinfo("Hoàn tất", "Đã reset toàn bộ dữ liệu.")
 
@@ -366,9 +2657,13 @@ def main():
         messagebox.showerror("Lỗi nghiêm trọng", f"Không thể tải hoặc đọc file '{CONFIG_FILE}'. Vui lòng kiểm tra lại file và chạy chương trình.")
         return
 
-    ai = PerformanceAI(config)
+    try:
+        ai = PerformanceAI(config)
+    except ValueError as e:
+        messagebox.showerror("Lỗi cấu hình", f"File '{CONFIG_FILE}' không hợp lệ: {e}")
+        return
     data_manager = DataManager(ACTIVITY_LOG_FILE)
-    app = Application(ai, data_manager)
+    app = Application(ai, data_manager, window_days=config.get(ROLLING_WINDOW_KEY))
     app.mainloop()
 
 